@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import json
 import math
+import os
 
 
 import seaborn as sns
@@ -12,11 +13,13 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
 
-from utils.helpers_step1 import  show_data_sample, plot_histograms, plot_boxplots, show_data_metrics, show_data_pie, show_global_score, show_qualitative_analysis
-
-df_student = pd.read_csv("assets/dataset/student/Student_performance_data _.csv")
-df_retail_features = pd.read_csv("assets/dataset/retail/Features data set.csv")
-df_retail_features_clean = pd.read_csv("assets/dataset/retail/clean/clean_Features data set.csv")
+from utils.helpers_step1 import  show_data_sample, plot_histograms, plot_boxplots, show_data_metrics, show_quality_score, show_qualitative_analysis
+from utils.datasets import get_dataset, show_load_stats, dataset_path, is_large_dataset
+from utils.streaming_profile import get_streaming_profile
+from utils.cleaning import clean_dataset, RETAIL_CLEANING_STEPS
+from utils.profiling import get_profile
+from utils.quality import global_quality_score, quality_issues, QUALITY_THRESHOLD
+from utils.asset_cache import load_json_asset
 
 def show(proyecto):
     """Paso 1: Preparación de Datos"""
@@ -39,24 +42,33 @@ def show(proyecto):
 
     st.subheader("📊 Data Facet")
 
-    if proyecto == "Student Performance Analysis":
-        show_data_facet(df = df_student, completeness=100, uniqueness=100, outliers=100, threshold=75)
+    if is_large_dataset(proyecto):
+        show_streaming_data_facet(dataset_path(proyecto), threshold=75)
+    elif proyecto == "Student Performance Analysis":
+        df = get_dataset(proyecto)
+        quality = get_profile(df)["quality"]
+        show_data_facet(df = df, completeness=quality["completeness"], uniqueness=quality["uniqueness"], outliers=quality["outliers"], threshold=75)
     elif proyecto == "Retail Data Analytics":
         if 'data_cleaned' not in st.session_state:
             st.session_state.data_cleaned = False
             
         if not st.session_state.data_cleaned:
-            completeness, uniqueness, outliers = 75.5, 100, 30
-            threshold = 75
-            c, u, o = 0.4, 0.3, 0.3 
-            global_score = c*completeness/100 + u*uniqueness/100 + o*outliers/100
+            df = get_dataset(proyecto)
+            quality = get_profile(df)["quality"]
+            completeness, uniqueness, outliers = quality["completeness"], quality["uniqueness"], quality["outliers"]
+            threshold = QUALITY_THRESHOLD
+            global_score = global_quality_score(quality)
+            issues = quality_issues(quality)
             
-            show_data_facet(df = df_retail_features, completeness=completeness, uniqueness=uniqueness, outliers=outliers, threshold=threshold)
+            show_data_facet(df = df, completeness=completeness, uniqueness=uniqueness, outliers=outliers, threshold=threshold)
             
-            # Display the clear button only if the score is less than 75.
-            if global_score < threshold:
+            # Display the clean button if the score is below the threshold or a facet found problems
+            if global_score < threshold or issues:
                 st.markdown("---")
-                st.warning("⚠️ The data quality is below the acceptable threshold.")
+                if global_score < threshold:
+                    st.warning("⚠️ The data quality is below the acceptable threshold.")
+                else:
+                    st.warning(f"⚠️ Found {', '.join(issues)} in the data; cleaning can address them.")
                 
                 col1, col2, col3 = st.columns([1, 1, 1])
                 with col2:
@@ -64,8 +76,11 @@ def show(proyecto):
                         st.session_state.data_cleaned = True
                         st.rerun()
         else:
-            # Display clean data
-            show_data_facet_clean(df = df_retail_features_clean, completeness=100, uniqueness=100, outliers=70, threshold=75)
+            # Run the cleaning pipeline (cached) and display clean data
+            cleaning = clean_dataset(get_dataset(proyecto), RETAIL_CLEANING_STEPS)
+            quality = cleaning["quality"]
+            show_data_facet_clean(df = cleaning["df"], completeness=quality["completeness"], uniqueness=quality["uniqueness"], outliers=quality["outliers"], threshold=75)
+            show_cleaning_audit(cleaning["audit"])
             
             # Option to revert to original data
             st.markdown("---")
@@ -76,11 +91,12 @@ def show(proyecto):
                 if st.button("View Original Data", use_container_width=True):
                     st.session_state.data_cleaned = False
                     st.rerun()
+
+    show_load_stats(proyecto)
     
 def show_source_facet(json_path: str):
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        full_evaluation = json.load(f)
+    full_evaluation = load_json_asset(json_path)
 
     dataset_info = full_evaluation.get("dataset_info", {})
     assessment = full_evaluation.get("reliability_assessment", {})
@@ -128,12 +144,38 @@ def show_data_facet(df, completeness, uniqueness, outliers, threshold):
     # Metric cards
     show_data_metrics(completeness, uniqueness, outliers)
 
-    # Pie chart
-    c, u, o = show_data_pie()
+    # Pie chart and Global Score (reruns alone when the weights change)
+    show_quality_score(completeness, uniqueness, outliers, threshold)
+
+
+def show_streaming_data_facet(path, threshold):
+    """
+    Data facet for datasets larger than memory, profiled in a single chunked pass over the CSV
+    """
+    st.info("This dataset is too large to load in memory: it was profiled in chunks. "
+            "Quantiles, distinct counts and plots are estimated on a uniform sample of the rows.")
+
+    profile = get_streaming_profile(path, os.path.getmtime(path))
+    quality = profile.quality()
+
+    # Data exploration
+    show_data_sample(profile.sample)
+
+    # qualitative analysis
+    show_qualitative_analysis(profile.sample, summary=profile.summary())
+
+    # histograms y boxplots
+    tab1, tab2 = st.tabs(["Histograms (Sample)", "Boxplots (Sample)"])
+    with tab1:
+        plot_histograms(profile.sample)
+    with tab2:
+        plot_boxplots(profile.sample)
 
-    # Global Score
-    global_score = c*completeness/100 + u*uniqueness/100 + o*outliers/100
-    show_global_score(global_score, threshold)
+    # Metric cards
+    show_data_metrics(quality["completeness"], quality["uniqueness"], quality["outliers"])
+
+    # Pie chart and Global Score (reruns alone when the weights change)
+    show_quality_score(quality["completeness"], quality["uniqueness"], quality["outliers"], threshold)
 
 
 def show_data_facet_clean(df, completeness, uniqueness, outliers, threshold):   
@@ -158,9 +200,31 @@ def show_data_facet_clean(df, completeness, uniqueness, outliers, threshold):
     # Metric cards
     show_data_metrics(completeness, uniqueness, outliers)
 
-    # Pie chart
-    c, u, o = show_data_pie()
+    # Pie chart and Global Score (reruns alone when the weights change)
+    show_quality_score(completeness, uniqueness, outliers, threshold)
+
+
+def show_cleaning_audit(audit):
+    """Audit log of the cleaning steps applied to the dataset"""
+    st.markdown("#### Cleaning Audit Log")
 
-    # Global Score
-    global_score = c*completeness/100 + u*uniqueness/100 + o*outliers/100
-    show_global_score(global_score, threshold)
\ No newline at end of file
+    rows = []
+    for entry in audit:
+        if entry["step"] == "impute":
+            details = f"{entry['values_filled']:,} missing values filled in {', '.join(entry['columns'])}"
+        elif entry["step"] == "drop_duplicates":
+            details = f"{entry['rows_removed']:,} duplicate rows removed"
+        elif entry["step"] == "cap_outliers":
+            capped = ", ".join(f"{col}: {n:,}" for col, n in entry["capped_per_column"].items())
+            details = f"{entry['values_capped']:,} values capped to the IQR fences" + (f" ({capped})" if capped else "")
+        else:
+            details = ""
+        rows.append({
+            "Step": entry["step"],
+            "Rows before": entry["rows_before"],
+            "Rows after": entry["rows_after"],
+            "Time (ms)": round(entry["seconds"] * 1000, 1),
+            "Details": details,
+        })
+
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
@@ -1,8 +1,13 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import requests
 import json
 import time
+import os
+import pandas as pd
+
+from utils.helpers_step3 import generate_rpcm_entities, get_project_paths, get_query_cache
+from utils.query_engine import QueryEngine, QueryError
+from utils.atlas_client import client_from_env, dsl_rows, AtlasError
 
 def show(proyecto):
     """Step 4: Taxonomy Queries"""
@@ -23,6 +28,93 @@ def show(proyecto):
     with tab2:
         show_interactive_query_builder(proyecto)
 
+@st.cache_resource(max_entries=8)
+def get_query_engine(proyecto, version, mtime):
+    """Query engine over the entities published for a project, one per entity version and Kaggle entities mtime"""
+    _, entities = get_query_cache().current(proyecto)
+    return QueryEngine(entities)
+
+@st.cache_resource(max_entries=8, show_spinner="Generating RPCM entities...")
+def publish_entities(proyecto, mtime):
+    """Generate and publish the project's entities once per modification time of its Kaggle entities"""
+    atlas_entities = generate_rpcm_entities(proyecto)
+    if atlas_entities is None:
+        return None
+    return get_query_cache().publish(proyecto, atlas_entities["entities"])
+
+def get_published_version(proyecto):
+    """
+    (version, mtime) of the project's published entities, or (None, None) without Kaggle entities.
+
+    The entities are generated and published again whenever entities_kaggle.json changes, so
+    Step 4 does not keep querying a stale set until Step 3 runs; otherwise the last published
+    set (by Step 3, or by an earlier call) is used.
+    """
+    try:
+        mtime = os.path.getmtime(get_project_paths(proyecto)["entities_kaggle"])
+    except OSError:
+        return None, None
+    if publish_entities(proyecto, mtime) is None:
+        return None, None
+    version, _ = get_query_cache().current(proyecto)
+    return version, mtime
+
+@st.cache_resource
+def get_atlas_client():
+    """Pooled Atlas client when ATLAS_URL is configured, shared by every session"""
+    return client_from_env()
+
+def show_atlas_query_results(client, query, proyecto):
+    """Run the DSL query on the configured Atlas server and show the rows"""
+    start = time.perf_counter()
+    try:
+        rows, cached = get_query_cache().run(proyecto, query, lambda dsl: dsl_rows(client.search_dsl(dsl)),
+                                             source="atlas")
+    except AtlasError as e:
+        st.error(f"Atlas query failed: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.subheader("Query Results")
+    st.caption(f"{len(rows)} result(s) from Apache Atlas in {elapsed_ms:.0f} ms{' (cached)' if cached else ''}")
+    if rows:
+        st.dataframe(pd.DataFrame(rows).fillna("").astype(str), hide_index=True, use_container_width=True)
+    else:
+        st.info("No entities match this query.")
+
+def show_query_results(query, proyecto):
+    """Run the DSL query against the generated RPCM entities (or Atlas, when configured) and show the rows"""
+    client = get_atlas_client()
+    if client is not None:
+        source = st.radio("Run query on", ["Local engine", "Apache Atlas"], horizontal=True)
+        if source == "Apache Atlas":
+            show_atlas_query_results(client, query, proyecto)
+            return
+
+    version, mtime = get_published_version(proyecto)
+    if version is None:
+        st.error("Could not load the Kaggle entities. Please run the metadata extraction first.")
+        return
+    engine = get_query_engine(proyecto, version, mtime)
+
+    start = time.perf_counter()
+    try:
+        rows, cached = get_query_cache().run(proyecto, query, engine.execute)
+    except QueryError as e:
+        st.error(f"Invalid query: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    plan = engine.plan(query)
+
+    st.subheader("Query Results")
+    st.caption(f"{len(rows)} result(s) in {elapsed_ms:.2f} ms{' (cached)' if cached else ''}, "
+               f"evaluated over {len(engine.entities)} generated entities")
+    st.caption(f"Plan: {plan.describe()}")
+    if rows:
+        st.dataframe(pd.DataFrame(rows).fillna("").astype(str), hide_index=True, use_container_width=True)
+    else:
+        st.info("No entities match this query.")
+
 def show_atlas_interface():
     """Muestra la interfaz de Atlas embebida"""
     st.subheader("Atlas Web Interface")
@@ -72,11 +164,6 @@ def get_query_options(proyecto):
                     "Keywords": ["name", "keywords"], 
                     "Timeline": ["name", "startDate", "endDate"],
                     "Complete": ["name", "keywords", "createdBy", "startDate", "endDate"]
-                },
-                "known_values": {
-                    "name": "Retail sales forecast",
-                    "createdBy": "aremoto",
-                    "keywords": ["data visualization", "finance", "business"]
                 }
             },
             "Input Datasets": {
@@ -90,14 +177,6 @@ def get_query_options(proyecto):
                 "fields": {
                     "File Info": ["name", "format"],
                     "Size Details": ["name", "size", "document"],
-                },
-                "known_results": {
-                    "csv_files": [
-                        "Dataset 1: sales data-set.csv (Quality Verified - Original CSV)",
-                        "Dataset 2: Features data set.csv (Quality Enhanced - CSV Cleaned)", 
-                        "Dataset 3: stores data-set.csv (Quality Verified - Original CSV)"
-                    ],
-                    "formats": ["csv", "png", "ipynb", "log"]
                 }
             },
             "Generated Outputs": {
@@ -112,15 +191,6 @@ def get_query_options(proyecto):
                     "Names Only": ["name"],
                     "With Format": ["name", "format"],
                     "Complete Info": ["name", "format", "size", "producer"]
-                },
-                "known_results": {
-                    "png_files": [
-                        "Chart: Figure 1 - no model - Gain some graphical insight",
-                        "Chart: Figure 2 - no model - Forecast of the total sales volume",
-                        "Chart: Figure 3 - no model - Model definition",
-                        "Chart: Figure 4 - no model - Forecast of the store-wise sales volume",
-                        "Chart: Figure 5 - no model - Look for predictive power from external variables"
-                    ]
                 }
             },
             "Process Execution": {
@@ -135,14 +205,6 @@ def get_query_options(proyecto):
                     "Status": ["name", "status"],
                     "Data Flow": ["name", "inputData", "outputData"],
                     "Complete": ["name", "status", "inputData", "outputData", "madeBy"]
-                },
-                "known_results": {
-                    "main_action": {
-                        "name": "Action - Notebook - Retail sales forecast",
-                        "status": "Completed",
-                        "inputData": "Analysis of 3 datasets: sales data-set.csv, Features data set.csv, stores data-set.csv",
-                        "outputData": "Generated 7 outputs including models and visualizations"
-                    }
                 }
             },
             "Validation Results": {
@@ -156,13 +218,6 @@ def get_query_options(proyecto):
                     "Results": ["result", "agreementLevel"],
                     "Details": ["name", "result", "typeConsensus"],
                     "Complete": ["name", "result", "agreementLevel", "typeConsensus", "resolvedBy"]
-                },
-                "known_results": {
-                    "validation": {
-                        "result": "approved",
-                        "agreementLevel": 100,
-                        "typeConsensus": "Individual Review"
-                    }
                 }
             }
         }
@@ -178,10 +233,6 @@ def get_query_options(proyecto):
                 "fields": {
                     "Basic Info": ["createdBy"],
                     "Project Info": ["qualifiedName", "startDate"]
-                },
-                "known_values": {
-                    "name": "Student Performance Analysis",
-                    "createdBy": "joelknapp"
                 }
             },
             "Input Dataset": {
@@ -192,13 +243,6 @@ def get_query_options(proyecto):
                 },
                 "fields": {
                     "File Info": ["name", "format", "size"],
-                },
-                "known_results": {
-                    "dataset": {
-                        "name": "Dataset 1: Student_performance_data _.csv (Quality Verified - Original CSV)",
-                        "size": 166901,
-                        "qualityScore": 100.0
-                    }
                 }
             },
             "Machine Learning Models": {
@@ -211,13 +255,6 @@ def get_query_options(proyecto):
                 "fields": {
                     "Model Names": ["name"],
                     "Model Details": ["name", "format", "size"],
-                },
-                "known_results": {
-                    "models": [
-                        "Model: SVC", "Model: RandomForestClassifier", "Model: AdaBoostClassifier",
-                        "Model: KNeighborsClassifier", "Model: CatBoostClassifier", "Model: XGBClassifier", 
-                        "Model: GradientBoostingClassifier", "Model: LGBMClassifier", "Model: DecisionTreeClassifier"
-                    ]
                 }
             },
             "Analysis Charts": {
@@ -229,15 +266,6 @@ def get_query_options(proyecto):
                 "fields": {
                     "Chart Names": ["name"],
                     "Chart Details": ["name", "format", "size"]
-                },
-                "known_results": {
-                    "charts": [
-                        "Chart: Figure 1 - KNeighborsClassifier - Correlation Among Features",
-                        "Chart: Figure 2 - KNeighborsClassifier - Selecting a Classification Model",
-                        "Chart: Figure 3 - KNeighborsClassifier - Model Evaluation",
-                        "Chart: Figure 4 - SVC - Model Evaluation (again)",
-                        "Chart: Figure 5 - GradientBoostingClassifier - Reducing Dimensionality"
-                    ]
                 }
             },
             "Process Execution": {
@@ -250,14 +278,6 @@ def get_query_options(proyecto):
                     "Execution": ["qualifiedName", "status"],
                     "Data Summary": ["inputData", "outputData"],
                     "Complete": ["qualifiedName", "status", "inputData", "outputData"]
-                },
-                "known_results": {
-                    "action": {
-                        "qualifiedName": "notebook-student-performance-analysis.ipynb-v1@StudentPerformanceAn",
-                        "status": "Completed", 
-                        "inputData": "Analysis of 1 datasets: Student_performance_data _.csv",
-                        "outputData": "Generated 16 outputs including models and visualizations"
-                    }
                 }
             }
         }
@@ -302,4 +322,6 @@ def build_interactive_query(category, options, proyecto):
     
     # Mostrar query generada
     st.subheader("Generated DSL Query")
-    st.code(query, language="sql")
\ No newline at end of file
+    st.code(query, language="sql")
+    
+    show_query_results(query, proyecto)
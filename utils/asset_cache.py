@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+# Parsed assets kept at most; the least recently used one is evicted first
+ASSET_CACHE_SIZE = 64
+
+_MISSING = object()
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is a read-only view of a cached asset; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """dict that cannot be modified in place (a shared, cached JSON object)"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenList(list):
+    """list that cannot be modified in place (a shared, cached JSON array)"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    """Read-only view of a parsed JSON value (nested dicts and lists included)"""
+    if isinstance(value, dict):
+        return value if isinstance(value, FrozenDict) else FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return value if isinstance(value, FrozenList) else FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable deep copy of a (frozen) JSON value"""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+class AssetCache:
+    """
+    JSON assets parsed once per process and shared by every step.
+
+    Entries are keyed by the file's real path and validated against its mtime and size, so an
+    asset edited on disk is parsed again on its next read. Parsed documents are handed out as
+    read-only views (FrozenDict / FrozenList): callers share one copy and cannot alter it.
+    """
+
+    def __init__(self, maxsize=ASSET_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, path):
+        """Parsed, read-only content of a JSON file; raises OSError or ValueError like json.load"""
+        key = os.path.realpath(path)
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(key, "r", encoding="utf-8") as f:
+            value = freeze(json.load(f))
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def evict(self, path=None):
+        """Drop one asset (or all of them) from the cache"""
+        with self._lock:
+            if path is None:
+                self.evictions += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(os.path.realpath(path), None) is not None:
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+# Shared by all steps (module state lives as long as the Streamlit server process)
+asset_cache = AssetCache()
+
+
+def load_json_asset(path, default=_MISSING):
+    """
+    Read-only content of a JSON asset through the shared cache.
+
+    Without a default, a missing or invalid file raises; with one, the default is returned instead.
+    """
+    try:
+        return asset_cache.load(path)
+    except (OSError, ValueError):
+        if default is _MISSING:
+            raise
+        return default
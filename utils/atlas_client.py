@@ -0,0 +1,219 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.json_export import entity_chunks, entity_references, CHUNK_MAX_ENTITIES, CHUNK_MAX_BYTES
+
+
+# Environment variables read by client_from_env
+ATLAS_URL_ENV = "ATLAS_URL"
+ATLAS_USER_ENV = "ATLAS_USER"
+ATLAS_PASSWORD_ENV = "ATLAS_PASSWORD"
+
+# Requests in flight at once (and pooled connections kept open)
+MAX_WORKERS = 8
+
+# Responses retried with exponential backoff; Retry-After is honored when the server sends it
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRIES = 5
+BACKOFF_FACTOR = 0.5
+TIMEOUT = 60
+
+
+class AtlasError(RuntimeError):
+    """An Atlas request that failed after its retries"""
+
+
+def _unique_reference(entity):
+    return {"typeName": entity["typeName"],
+            "uniqueAttributes": {"qualifiedName": entity["attributes"]["qualifiedName"]}}
+
+
+def _rewrite_references(value, guids, external):
+    if isinstance(value, dict):
+        if "guid" in value and "typeName" in value:
+            return value if value["guid"] in guids else external.get(value["guid"], value)
+        return {k: _rewrite_references(v, guids, external) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rewrite_references(v, guids, external) for v in value]
+    return value
+
+
+def with_unique_references(chunk, entities_by_guid):
+    """
+    Entities of a chunk whose references to entities outside the chunk use uniqueAttributes.
+
+    Placeholder (negative) GUIDs only resolve within one request, so an entity created by an
+    earlier chunk is referenced by its typeName and qualifiedName instead.
+    """
+    guids = {entity["guid"] for entity in chunk}
+    external = {guid: _unique_reference(entities_by_guid[guid])
+                for entity in chunk for guid in entity_references(entity)
+                if guid not in guids and guid in entities_by_guid}
+    if not external:
+        return chunk
+    return [{k: (_rewrite_references(v, guids, external) if k in ("attributes", "relationshipAttributes") else v)
+             for k, v in entity.items()} for entity in chunk]
+
+
+class AtlasClient:
+    """
+    Apache Atlas REST client sharing one pooled HTTP session across worker threads.
+
+    Failed requests (429 and 5xx, connection errors) are retried with exponential backoff,
+    waiting for Retry-After when the server asks for it. Bulk ingestion and searches run
+    concurrently with at most max_workers requests in flight.
+    """
+
+    def __init__(self, base_url, auth=None, max_workers=MAX_WORKERS, timeout=TIMEOUT,
+                 retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # entity/bulk is idempotent for entities with qualifiedNames, so POSTs retry too
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.auth = auth
+        self.session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method, path, **kwargs):
+        try:
+            response = self.session.request(method, f"{self.base_url}/api/atlas/v2/{path}",
+                                            timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise AtlasError(f"{method} {path} failed: {e}") from e
+        if response.status_code >= 400:
+            raise AtlasError(f"{method} {path} returned {response.status_code}: {response.text[:500]}")
+        return response.json() if response.content else {}
+
+    def create_entities(self, entities):
+        """POST entity/bulk; returns the Atlas mutation response (guidAssignments, mutatedEntities)"""
+        return self._request("POST", "entity/bulk", json={"entities": entities})
+
+    def search_dsl(self, query, limit=None, offset=None):
+        """GET search/dsl for one DSL query"""
+        params = {"query": query}
+        if limit is not None:
+            params["limit"] = limit
+        if offset is not None:
+            params["offset"] = offset
+        return self._request("GET", "search/dsl", params=params)
+
+    def search_many(self, queries, limit=None):
+        """Run DSL searches concurrently; results (or the AtlasError raised) in query order"""
+        def search(query):
+            try:
+                return self.search_dsl(query, limit=limit)
+            except AtlasError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(search, queries))
+
+    def ingest(self, entities, max_entities=CHUNK_MAX_ENTITIES, max_bytes=CHUNK_MAX_BYTES):
+        """
+        Create the entities of one project in dependency-ordered chunks, one POST per chunk.
+
+        Chunks are sent in order because later chunks reference entities created by earlier ones.
+        Stops at the first failed chunk; the result says how many chunks were accepted, so the
+        ingest can resume from there.
+        """
+        entities_by_guid = {entity["guid"]: entity for entity in entities if "guid" in entity}
+        result = {"chunks": 0, "entities": 0, "guid_assignments": {}, "error": None}
+        start = time.perf_counter()
+
+        for chunk in entity_chunks(entities, max_entities, max_bytes):
+            try:
+                response = self.create_entities(with_unique_references(chunk, entities_by_guid))
+            except AtlasError as e:
+                result["error"] = str(e)
+                break
+            result["chunks"] += 1
+            result["entities"] += len(chunk)
+            result["guid_assignments"].update(response.get("guidAssignments", {}))
+
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _map_bounded(self, function, items):
+        """
+        Results of function over items in order, with at most max_workers calls in flight.
+
+        Items are pulled from the iterable only as workers free up, so a generator of large
+        documents is never materialized at once (executor.map would consume it all upfront).
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for item in items:
+                if len(pending) >= self.max_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(function, item))
+            while pending:
+                yield pending.popleft().result()
+
+    def ingest_many(self, documents, max_entities=CHUNK_MAX_ENTITIES, max_bytes=CHUNK_MAX_BYTES):
+        """
+        Ingest several bulk documents ({"entities": [...]}) concurrently.
+
+        Each document's chunks go in order, while different documents (projects) are sent in
+        parallel through the pooled session. Returns one ingest result per document.
+        """
+        def ingest(document):
+            return self.ingest(document.get("entities", []), max_entities, max_bytes)
+
+        return list(self._map_bounded(ingest, documents))
+
+    def ingest_files(self, paths, max_entities=CHUNK_MAX_ENTITIES, max_bytes=CHUNK_MAX_BYTES):
+        """
+        Ingest bulk Atlas files concurrently, like ingest_many.
+
+        Each file is read inside its worker, so only the documents being sent are in memory.
+        """
+        def ingest(path):
+            with open(path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            return self.ingest(document.get("entities", []), max_entities, max_bytes)
+
+        return list(self._map_bounded(ingest, paths))
+
+def dsl_rows(response):
+    """Rows of a search/dsl response: select queries return columns and values, others full entities"""
+    selected = response.get("attributes")
+    if selected:
+        return [dict(zip(selected.get("name", []), values)) for values in selected.get("values", [])]
+    return [dict(entity.get("attributes", {})) for entity in response.get("entities", [])]
+
+
+def client_from_env(**options):
+    """AtlasClient for ATLAS_URL (with ATLAS_USER / ATLAS_PASSWORD basic auth), or None if it is not set"""
+    base_url = os.environ.get(ATLAS_URL_ENV)
+    if not base_url:
+        return None
+    user = os.environ.get(ATLAS_USER_ENV)
+    auth = (user, os.environ.get(ATLAS_PASSWORD_ENV, "")) if user else None
+    return AtlasClient(base_url, auth=auth, **options)
@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.transformation import transform_project
+from utils.guids import merge_bulk_documents, MergeConflictError
+from utils.json_export import write_chunks, CHUNK_MAX_ENTITIES, CHUNK_MAX_BYTES
+from utils.atlas_client import AtlasClient, client_from_env
+
+
+# Kaggle metadata files picked up in the input directory
+INPUT_FILENAME = "entities_kaggle.json"
+
+# Projects handed to a worker process at a time
+CHUNK_SIZE = 16
+
+# Single ingest file written with --merge, and the folder of its chunks written with --chunk-*
+MERGED_FILENAME = "merged_entities_bulk_atlas.json"
+CHUNKS_DIRNAME = "chunks"
+
+
+def is_kaggle_document(path):
+    """True for a Kaggle metamodel document (a JSON object with Project and Owner entries)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(document, dict) and "Project" in document and "Owner" in document
+
+
+def find_projects(input_dir):
+    """
+    Kaggle metadata documents below input_dir, as (project id, path).
+
+    A project is either a folder holding an entities_kaggle.json (id = folder path) or another
+    .json file holding a Kaggle metamodel document (id = file name without extension).
+    Other JSON files (extraction results, reports, earlier bulk outputs) are skipped.
+    """
+    projects = []
+    for root, _, files in os.walk(input_dir):
+        for name in sorted(files):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            if name == INPUT_FILENAME:
+                project_id = os.path.relpath(root, input_dir).replace(os.sep, "__")
+            elif not is_kaggle_document(path):
+                continue
+            else:
+                project_id = os.path.splitext(os.path.relpath(path, input_dir))[0].replace(os.sep, "__")
+            projects.append((project_id, path))
+    return sorted(projects)
+
+
+def transform_file(project_id, path, output_dir, start_date=None):
+    """
+    Transform one Kaggle metadata file and write its bulk Atlas file.
+
+    The project start date is the document's Project.startDate, else start_date (epoch
+    milliseconds, or none), so the output only depends on the inputs and re-runs are identical.
+    Runs inside a worker process; only a small result record travels back to the parent.
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            kaggle = json.load(f)
+        bulk = transform_project(kaggle, start_date=kaggle.get("Project", {}).get("startDate", start_date))
+
+        output_path = os.path.join(output_dir, f"{project_id}_entities_bulk_atlas.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(bulk, f, ensure_ascii=False, separators=(",", ":"))
+        error = None
+        n_entities = len(bulk["entities"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        output_path, n_entities, error = None, 0, f"{type(e).__name__}: {e}"
+
+    return {
+        "project": project_id,
+        "input": path,
+        "output": output_path,
+        "entities": n_entities,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def _transform_args(args):
+    return transform_file(*args)
+
+
+def summarize(results, wall_seconds):
+    """Throughput and per-project latency percentiles of a batch"""
+    latencies = np.array([r["seconds"] for r in results if r["error"] is None])
+    return {
+        "projects": len(results),
+        "succeeded": int(len(latencies)),
+        "failed": [{"project": r["project"], "error": r["error"]} for r in results if r["error"] is not None],
+        "entities": sum(r["entities"] for r in results),
+        "wall_seconds": round(wall_seconds, 3),
+        "projects_per_second": round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2) if len(latencies) else None,
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2) if len(latencies) else None,
+    }
+
+
+def merge_outputs(results, output_path, chunks_dir=None, max_entities=None, max_bytes=None, ndjson=False):
+    """
+    Merge the bulk files of a batch into one ingest file with GUIDs unique across projects.
+
+    With chunks_dir, the merged entities are also split into dependency-ordered chunks there.
+    """
+    def documents():
+        for result in results:
+            if result["output"] is not None:
+                with open(result["output"], "r", encoding="utf-8") as f:
+                    yield json.load(f)
+
+    merged = merge_bulk_documents(documents())
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False, separators=(",", ":"))
+
+    if chunks_dir is not None:
+        os.makedirs(chunks_dir, exist_ok=True)
+        write_chunks(merged["entities"], lambda name: open(os.path.join(chunks_dir, name), "wb"),
+                     max_entities, max_bytes, ndjson)
+    return len(merged["entities"])
+
+
+def ingest_outputs(results, client, max_entities=None, max_bytes=None):
+    """Push the bulk file of every transformed project to Atlas, several projects at a time"""
+    transformed = [result for result in results if result["output"] is not None]
+    start = time.perf_counter()
+    limits = {key: value for key, value in (("max_entities", max_entities), ("max_bytes", max_bytes)) if value}
+    ingested = client.ingest_files([result["output"] for result in transformed], **limits)
+    elapsed = time.perf_counter() - start
+
+    for result, ingest in zip(transformed, ingested):
+        result["ingest"] = {key: ingest[key] for key in ("chunks", "entities", "seconds", "error")}
+    return {
+        "projects": len(ingested),
+        "entities": sum(ingest["entities"] for ingest in ingested),
+        "failed": [{"project": r["project"], "error": i["error"]} for r, i in zip(transformed, ingested) if i["error"]],
+        "seconds": round(elapsed, 3),
+        "projects_per_second": round(len(ingested) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def run_batch(input_dir, output_dir, workers=None, chunksize=CHUNK_SIZE, merge=False,
+              chunk_entities=None, chunk_bytes=None, ndjson=False, atlas_client=None, start_date=None):
+    """
+    Transform every Kaggle project below input_dir across a process pool.
+
+    Writes one bulk Atlas file per project plus batch_summary.json to output_dir
+    and returns the summary. With merge, the bulk files are also merged into a single ingest file,
+    split into dependency-ordered chunks when chunk_entities or chunk_bytes is given.
+    With atlas_client, every project is also ingested into Atlas.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(project_id, path, output_dir, start_date) for project_id, path in find_projects(input_dir)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [transform_file(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_transform_args, tasks, chunksize=chunksize))
+    summary = summarize(results, time.perf_counter() - start)
+    if merge:
+        chunked = chunk_entities is not None or chunk_bytes is not None or ndjson
+        if ndjson and not (chunk_entities or chunk_bytes):
+            # NDJSON only exists as chunks: use the default chunk limits
+            chunk_entities, chunk_bytes = CHUNK_MAX_ENTITIES, CHUNK_MAX_BYTES
+        summary["merged_entities"] = merge_outputs(
+            results, os.path.join(output_dir, MERGED_FILENAME),
+            chunks_dir=os.path.join(output_dir, CHUNKS_DIRNAME) if chunked else None,
+            max_entities=chunk_entities, max_bytes=chunk_bytes, ndjson=ndjson,
+        )
+    if atlas_client is not None:
+        summary["ingest"] = ingest_outputs(results, atlas_client, chunk_entities, chunk_bytes)
+
+    with open(os.path.join(output_dir, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "projects": results}, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transform a directory of Kaggle metadata files into bulk Atlas entities.")
+    parser.add_argument("input_dir", help="directory with entities_kaggle.json-style files")
+    parser.add_argument("output_dir", help="directory where the bulk Atlas files are written")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="projects sent to a worker at a time")
+    parser.add_argument("--merge", action="store_true", help=f"also write every project into {MERGED_FILENAME}")
+    parser.add_argument("--chunk-entities", type=int, default=None, help="with --merge, max entities per chunk")
+    parser.add_argument("--chunk-bytes", type=int, default=None, help="with --merge, max bytes per chunk")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="with --merge, write chunks as newline-delimited JSON (default chunk limits unless --chunk-* is given)")
+    parser.add_argument("--ingest", action="store_true",
+                        help="push every project to Atlas (--atlas-url, or ATLAS_URL / ATLAS_USER / ATLAS_PASSWORD)")
+    parser.add_argument("--atlas-url", default=None, help="Atlas base URL, e.g. http://localhost:21000")
+    parser.add_argument("--start-date", type=int, default=None,
+                        help="project start date (epoch ms) for documents without Project.startDate")
+    args = parser.parse_args(argv)
+    if args.ndjson and not args.merge:
+        parser.error("--ndjson writes the merged chunks and needs --merge")
+
+    client = None
+    if args.ingest:
+        client = AtlasClient(args.atlas_url) if args.atlas_url else client_from_env()
+        if client is None:
+            parser.error("--ingest needs --atlas-url or the ATLAS_URL environment variable")
+
+    try:
+        summary = run_batch(args.input_dir, args.output_dir, workers=args.workers, chunksize=args.chunksize,
+                            merge=args.merge, chunk_entities=args.chunk_entities, chunk_bytes=args.chunk_bytes,
+                            ndjson=args.ndjson, atlas_client=client, start_date=args.start_date)
+    except MergeConflictError as e:
+        parser.exit(1, f"Merge failed: {e}\n")
+    finally:
+        if client is not None:
+            client.close()
+    print(f"{summary['succeeded']}/{summary['projects']} projects in {summary['wall_seconds']} s "
+          f"({summary['projects_per_second']} projects/s), "
+          f"p50 {summary['latency_p50_ms']} ms, p95 {summary['latency_p95_ms']} ms")
+    for failure in summary["failed"]:
+        print(f"FAILED {failure['project']}: {failure['error']}")
+    if "ingest" in summary:
+        ingest = summary["ingest"]
+        print(f"Ingested {ingest['entities']} entities of {ingest['projects']} projects into Atlas in "
+              f"{ingest['seconds']} s ({ingest['projects_per_second']} projects/s)")
+        for failure in ingest["failed"]:
+            print(f"INGEST FAILED {failure['project']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
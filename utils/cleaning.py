@@ -0,0 +1,113 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import time
+
+from utils.quality import compute_quality, iqr_fences
+from utils.profiling import dataset_fingerprint
+
+
+def _float_columns(df):
+    return list(df.select_dtypes(include=['floating']).columns)
+
+
+def impute_missing(df, columns=None, strategy="median", group_by=None):
+    """
+    Fill missing values of numeric columns.
+
+    With group_by, each gap is first filled with the statistic of its group (e.g. the store);
+    gaps left over (groups with no values at all) use the statistic of the whole column.
+    strategy is "median", "mean" or a constant value.
+    """
+    if columns is None:
+        columns = [col for col in _float_columns(df) if df[col].isna().any()]
+    columns = [col for col in columns if col in df.columns]
+    if not columns:
+        return df, {"columns": [], "values_filled": 0}
+
+    missing_before = int(df[columns].isna().to_numpy().sum())
+    filled = df[columns]
+
+    if strategy in ("median", "mean"):
+        if group_by is not None:
+            filled = filled.fillna(df.groupby(group_by, observed=True)[columns].transform(strategy))
+        filled = filled.fillna(filled.agg(strategy))
+    else:
+        filled = filled.fillna(strategy)
+
+    result = df.assign(**{col: filled[col] for col in columns})
+    return result, {"columns": columns, "values_filled": missing_before - int(filled.isna().to_numpy().sum())}
+
+
+def drop_duplicates(df, subset=None):
+    """Remove rows that repeat an earlier row"""
+    result = df.drop_duplicates(subset=subset, ignore_index=True)
+    return result, {"rows_removed": len(df) - len(result)}
+
+
+def cap_outliers(df, columns=None, k=1.5):
+    """Clip values outside the IQR fences of each column to the fence (winsorizing)"""
+    if columns is None:
+        columns = _float_columns(df)
+    columns = [col for col in columns if col in df.columns]
+    if not columns:
+        return df, {"columns": [], "values_capped": 0}
+
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    _, _, lower, upper = iqr_fences(values, k=k)
+    with np.errstate(invalid="ignore"):
+        capped_counts = ((values < lower) | (values > upper)).sum(axis=0)
+
+    clipped = np.clip(values, lower, upper)
+    result = df.assign(**{col: clipped[:, j] for j, col in enumerate(columns)})
+    return result, {
+        "columns": columns,
+        "values_capped": int(capped_counts.sum()),
+        "capped_per_column": {col: int(n) for col, n in zip(columns, capped_counts) if n > 0},
+    }
+
+
+# Available cleaning steps, referenced by name in a pipeline
+CLEANING_STEPS = {
+    "impute": impute_missing,
+    "drop_duplicates": drop_duplicates,
+    "cap_outliers": cap_outliers,
+}
+
+# Cleaning pipeline of the retail features dataset: (step, parameters)
+RETAIL_CLEANING_STEPS = [
+    ("impute", {"columns": ["MarkDown1", "MarkDown2", "MarkDown3", "MarkDown4", "MarkDown5"],
+                "strategy": "median", "group_by": "Store"}),
+    ("impute", {"columns": ["CPI", "Unemployment"], "strategy": "median", "group_by": "Store"}),
+    ("drop_duplicates", {}),
+    ("cap_outliers", {"columns": ["Temperature", "MarkDown1", "MarkDown2", "MarkDown3",
+                                  "MarkDown4", "MarkDown5", "Unemployment"]}),
+]
+
+
+def run_cleaning(df, steps):
+    """Apply cleaning steps in order and return the clean frame and one audit entry per step"""
+    audit = []
+    for name, params in steps:
+        rows_before = len(df)
+        start = time.perf_counter()
+        df, details = CLEANING_STEPS[name](df, **params)
+        audit.append({
+            "step": name,
+            "rows_before": rows_before,
+            "rows_after": len(df),
+            "seconds": time.perf_counter() - start,
+            **details,
+        })
+    return df, audit
+
+
+@st.cache_data(max_entries=16, hash_funcs={pd.DataFrame: dataset_fingerprint}, show_spinner="Cleaning data...")
+def clean_dataset(df, steps):
+    """
+    Run a cleaning pipeline and re-score the result with the quality metrics.
+
+    Cached by input fingerprint and steps, so cleaning the same data the same way is instant.
+    """
+    cleaned, audit = run_cleaning(df, steps)
+    return {"df": cleaned, "audit": audit, "quality": compute_quality(cleaned)}
@@ -0,0 +1,137 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+
+
+# Typed columnar copies of the datasets are written here
+CACHE_DIR = "assets/dataset/.cache"
+
+# Schema metadata key holding the DataFrame attrs
+ATTRS_KEY = b"rpcm_attrs"
+
+
+def _cache_paths(path, reader):
+    """Feather file and metadata sidecar for a source dataset read with a given reader"""
+    source = f"{os.path.abspath(path)}|{reader.__module__}.{reader.__qualname__}"
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(CACHE_DIR, f"{key}-{os.path.basename(path)}")
+    return f"{base}.feather", f"{base}.meta.json"
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_cache_valid(path, meta_path):
+    """
+    A cached copy is valid while the source mtime and size are unchanged. If they changed,
+    the source hash decides, so touching a file without modifying it keeps the cache.
+    """
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    stat = os.stat(path)
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return True
+
+    if meta.get("sha256") == file_hash(path):
+        meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        return True
+    return False
+
+
+def _write_cache(path, df, feather_path, meta_path):
+    """Write the typed columnar copy; the cache is skipped if it cannot be written"""
+    stat = os.stat(path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{feather_path}.tmp"
+        table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        # df.attrs travel with the file in the schema metadata
+        metadata = {**(table.schema.metadata or {}), ATTRS_KEY: json.dumps(df.attrs).encode("utf-8")}
+        # Uncompressed so the file can be memory-mapped on read
+        feather.write_feather(table.replace_schema_metadata(metadata), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, feather_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"source": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                       "sha256": file_hash(path)}, f)
+    except (OSError, ValueError, pa.ArrowException):
+        return False
+    return True
+
+
+def read_columnar(feather_path):
+    """Read a cached Feather file through a memory map"""
+    table = feather.read_table(feather_path, memory_map=True)
+    df = table.to_pandas(split_blocks=True)
+    attrs = (table.schema.metadata or {}).get(ATTRS_KEY)
+    if attrs:
+        df.attrs.update(json.loads(attrs))
+    return df
+
+
+def load_columnar(path, reader=pd.read_csv):
+    """
+    Load a dataset through its columnar cache.
+
+    The first load parses the source with `reader` and writes a typed Feather copy; later loads
+    read that copy until the source changes. Returns the DataFrame and where it was read from.
+    """
+    feather_path, meta_path = _cache_paths(path, reader)
+
+    if os.path.exists(feather_path) and _is_cache_valid(path, meta_path):
+        try:
+            return read_columnar(feather_path), "columnar cache"
+        except (OSError, pa.ArrowException):
+            pass
+
+    df = reader(path)
+    _write_cache(path, df, feather_path, meta_path)
+    return df, "csv"
+
+
+def _measure(load):
+    """Wall time and peak memory (Python heap plus Arrow pool) of a loader"""
+    pool = pa.proxy_memory_pool(pa.default_memory_pool())
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = load(pool)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Release the frame before the pool it was allocated from goes away
+    del df
+    return elapsed, peak + pool.max_memory()
+
+
+def compare_load_paths(path, reader=pd.read_csv):
+    """Load time and peak memory of parsing the CSV against reading its columnar cache"""
+    feather_path, meta_path = _cache_paths(path, reader)
+    if not (os.path.exists(feather_path) and _is_cache_valid(path, meta_path)):
+        load_columnar(path, reader)
+
+    csv_seconds, csv_peak = _measure(lambda pool: reader(path))
+    cache_seconds, cache_peak = _measure(
+        lambda pool: feather.read_table(feather_path, memory_map=True).to_pandas(split_blocks=True, memory_pool=pool)
+    )
+
+    return [
+        {"Path": "CSV", "Load time (ms)": round(csv_seconds * 1000, 1),
+         "Peak memory (MB)": round(csv_peak / (1024 * 1024), 2)},
+        {"Path": "Columnar cache", "Load time (ms)": round(cache_seconds * 1000, 1),
+         "Peak memory (MB)": round(cache_peak / (1024 * 1024), 2)},
+    ]
@@ -0,0 +1,100 @@
+import streamlit as st
+import pandas as pd
+import time
+import os
+
+from utils.columnar_cache import load_columnar, compare_load_paths
+from utils.schema import read_optimized_csv
+
+
+# Datasets available for each project, loaded on first use
+DATASETS = {
+    "Student Performance Analysis": {
+        "raw": "assets/dataset/student/Student_performance_data _.csv",
+    },
+    "Retail Data Analytics": {
+        "raw": "assets/dataset/retail/Features data set.csv",
+    },
+}
+
+# Datasets larger than this are profiled in chunks instead of being loaded into memory
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+# Load statistics of every dataset parsed by this process, keyed by path
+_load_stats = {}
+
+
+@st.cache_resource(show_spinner="Loading dataset...")
+def _load_csv(path):
+    """Load a dataset once per process and share the frame across sessions and reruns"""
+    start = time.perf_counter()
+    df, source = load_columnar(path, reader=read_optimized_csv)
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "path": path,
+        "source": source,
+        "rows": len(df),
+        "columns": df.shape[1],
+        "load_seconds": elapsed,
+        "memory_bytes": int(df.memory_usage(deep=True).sum()),
+        "schema_report": df.attrs.get("schema_report", {}),
+    }
+    return df, stats
+
+
+def get_dataset(proyecto, kind="raw"):
+    """Return the dataset of a project, parsing it the first time it is requested"""
+    path = dataset_path(proyecto, kind)
+    df, stats = _load_csv(path)
+    _load_stats[path] = stats
+    return df
+
+
+def dataset_path(proyecto, kind="raw"):
+    """Path of a project dataset"""
+    return DATASETS[proyecto][kind]
+
+
+def is_large_dataset(proyecto, kind="raw"):
+    """True if the dataset is too large to be loaded in memory and must be streamed"""
+    return os.path.getsize(dataset_path(proyecto, kind)) > STREAMING_THRESHOLD_BYTES
+
+
+def get_load_stats(proyecto=None):
+    """Load statistics of the datasets parsed so far, optionally for one project"""
+    if proyecto is None:
+        return list(_load_stats.values())
+    paths = DATASETS.get(proyecto, {}).values()
+    return [_load_stats[path] for path in paths if path in _load_stats]
+
+
+def show_load_stats(proyecto):
+    """Display how long each project dataset took to load and its memory footprint"""
+    stats = get_load_stats(proyecto)
+    if not stats:
+        return
+
+    with st.expander("⏱️ Dataset load statistics"):
+        rows = [
+            {
+                "Dataset": s["path"].split("/")[-1],
+                "Read from": s["source"],
+                "Rows": s["rows"],
+                "Columns": s["columns"],
+                "Load time (ms)": round(s["load_seconds"] * 1000, 1),
+                "Memory (MB)": round(s["memory_bytes"] / (1024 * 1024), 2),
+                "Saved by dtypes (MB)": round(s["schema_report"].get("memory_saved", 0) / (1024 * 1024), 2),
+            }
+            for s in stats
+        ]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        st.caption("Datasets are loaded on first use and shared across sessions and reruns. "
+                   "CSVs are parsed once, with dates parsed, numbers downcast and low-cardinality "
+                   "text stored as categoricals, and then read from a typed columnar copy.")
+
+        if st.button("Compare CSV parsing with the columnar cache"):
+            for s in stats:
+                st.markdown(f"**{s['path'].split('/')[-1]}**")
+                st.dataframe(pd.DataFrame(compare_load_paths(s["path"], reader=read_optimized_csv)),
+                             hide_index=True, use_container_width=True)
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+
+from utils.guids import GuidAllocator
+from utils.transformation import (
+    TransformationContext,
+    build_process_entities,
+    build_dataset_entities,
+    build_output_entities,
+    build_action_entities,
+)
+
+
+# Bumped when the snapshot layout or the transformation rules change; older snapshots are ignored
+SNAPSHOT_VERSION = 4
+
+# Transformation rules in the order their entities appear in the bulk document
+RULES = ("process", "datasets", "outputs", "actions")
+
+# Context entities the later rules reference, by typeName among the process entities
+CONTEXT_ENTITIES = {"user": "User", "project": "Project", "experiment": "Experiment", "iteration": "Iteration"}
+
+
+def _fingerprint(*values):
+    text = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def rule_fingerprints(kaggle, dataset_quality=None, start_date=None):
+    """
+    Hash of the inputs each transformation rule reads.
+
+    The project title (suffix of every qualifiedName) and the owner (referenced by every
+    entity) are inputs of all rules. A rule whose fingerprint is unchanged produces the same
+    entities, so its previous output can be reused without running it.
+    """
+    project = kaggle.get("Project", {})
+    owner = kaggle.get("Owner", {})
+    title = project.get("title")
+    return {
+        "process": _fingerprint(project, owner, start_date),
+        "datasets": _fingerprint(title, owner, kaggle.get("File", []), dataset_quality or {}),
+        "outputs": _fingerprint(title, owner, kaggle.get("Notebook", {}), kaggle.get("Log", {}),
+                                kaggle.get("CodeLine", {})),
+        "actions": _fingerprint(title, owner, kaggle.get("Notebook", {})),
+    }
+
+
+def _identity(entity):
+    return entity["typeName"], entity["attributes"]["qualifiedName"]
+
+
+def _deleted_reference(entity):
+    """Reference to a deleted entity: Atlas deletes by typeName and qualifiedName"""
+    return {
+        "typeName": entity["typeName"],
+        "guid": entity["guid"],
+        "uniqueAttributes": {"qualifiedName": entity["attributes"]["qualifiedName"]},
+    }
+
+
+def diff_entities(previous, current):
+    """(created, updated, deleted, unchanged count) between two entity lists, matched by typeName and qualifiedName"""
+    previous_by_identity = {_identity(entity): entity for entity in previous}
+    created, updated, unchanged = [], [], 0
+    for entity in current:
+        before = previous_by_identity.pop(_identity(entity), None)
+        if before is None:
+            created.append(entity)
+        elif before != entity:
+            updated.append(entity)
+        else:
+            unchanged += 1
+    return created, updated, [_deleted_reference(entity) for entity in previous_by_identity.values()], unchanged
+
+
+def _valid_snapshot(snapshot):
+    return (isinstance(snapshot, dict) and snapshot.get("version") == SNAPSHOT_VERSION
+            and isinstance(snapshot.get("rules"), dict) and isinstance(snapshot.get("fingerprints"), dict))
+
+
+def snapshot_start_date(snapshot):
+    """startDate of the Project entity in a snapshot, or None"""
+    if not _valid_snapshot(snapshot):
+        return None
+    for entity in snapshot["rules"].get("process", []):
+        if entity["typeName"] == "Project":
+            return entity["attributes"].get("startDate")
+    return None
+
+
+def transform_delta(kaggle, snapshot=None, dataset_quality=None, start_date=None, progress=None):
+    """
+    Transform a Kaggle metamodel document incrementally against the previous snapshot.
+
+    Only the rules whose inputs changed since the snapshot are run; the others reuse their
+    previous entities. GUIDs of the snapshot entities are reserved first, so an entity keeps
+    its GUID across runs. The rebuilt entities are diffed against the previous ones.
+
+    Returns (bulk document, delta, new snapshot). The delta holds the created, updated and
+    deleted entities (deleted ones as typeName/qualifiedName references), the number of
+    unchanged entities, and the rules that ran. Without a usable snapshot every rule runs and
+    every entity is created; the bulk document is then the same as transform_project's.
+    """
+    def report(fraction, label):
+        if progress is not None:
+            progress(fraction, label)
+
+    fingerprints = rule_fingerprints(kaggle, dataset_quality, start_date)
+    if _valid_snapshot(snapshot):
+        previous_rules, previous_fingerprints = snapshot["rules"], snapshot["fingerprints"]
+    else:
+        previous_rules, previous_fingerprints = {}, {}
+
+    allocator = GuidAllocator()
+    for entities in previous_rules.values():
+        for entity in entities:
+            allocator.reserve(entity["typeName"], entity["attributes"]["qualifiedName"], entity["guid"])
+    ctx = TransformationContext(kaggle, dataset_quality, start_date, allocator)
+
+    def reusable(rule):
+        return rule in previous_rules and previous_fingerprints.get(rule) == fingerprints[rule]
+
+    rules, rebuilt = {}, []
+
+    report(0.0, "Comparing with the previous transformation")
+    if reusable("process"):
+        rules["process"] = previous_rules["process"]
+        by_type = {entity["typeName"]: entity for entity in rules["process"]}
+        ctx.entities.update({key: by_type[type_name] for key, type_name in CONTEXT_ENTITIES.items()})
+    else:
+        report(0.1, "Generating RPCM Project structure")
+        rules["process"] = build_process_entities(ctx)
+        rebuilt.append("process")
+
+    for rule, builder, fraction, label in (("datasets", build_dataset_entities, 0.3, "Transforming data entities"),
+                                           ("outputs", build_output_entities, 0.55, "Transforming notebook outputs")):
+        if reusable(rule):
+            rules[rule] = previous_rules[rule]
+        else:
+            report(fraction, label)
+            rules[rule] = builder(ctx)
+            rebuilt.append(rule)
+
+    # The Action references every dataset and output, so it follows their changes
+    if reusable("actions") and "datasets" not in rebuilt and "outputs" not in rebuilt:
+        rules["actions"] = previous_rules["actions"]
+    else:
+        report(0.8, "Building Action workflows and relationships")
+        rules["actions"] = build_action_entities(ctx, rules["datasets"], rules["outputs"])
+        rebuilt.append("actions")
+
+    report(0.9, "Computing changed entities")
+    delta = {"created": [], "updated": [], "deleted": [], "unchanged": 0, "rebuilt_rules": rebuilt}
+    for rule in RULES:
+        if rule not in rebuilt:
+            delta["unchanged"] += len(rules[rule])
+            continue
+        created, updated, deleted, unchanged = diff_entities(previous_rules.get(rule, []), rules[rule])
+        delta["created"] += created
+        delta["updated"] += updated
+        delta["deleted"] += deleted
+        delta["unchanged"] += unchanged
+
+    report(1.0, "Finalizing RPCM entities")
+    bulk = {"entities": [entity for rule in RULES for entity in rules[rule]]}
+    snapshot = {"version": SNAPSHOT_VERSION, "fingerprints": fingerprints, "rules": rules}
+    return bulk, delta, snapshot
+
+
+def delta_summary(delta):
+    return {key: len(delta[key]) for key in ("created", "updated", "deleted")} | {"unchanged": delta["unchanged"]}
+
+
+def load_snapshot(path):
+    """Previous snapshot written by save_snapshot, or None if there is none (or it is unreadable)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(snapshot, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
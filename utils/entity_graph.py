@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+
+# UsedData categories by file format; inputs of an Action are counted as Datasets whatever their format
+USED_DATA_FORMATS = {
+    "ipynb": "Notebooks",
+    "log": "Logs",
+    "png": "Visualizations",
+    "pickle": "ML Models",
+}
+
+
+def _references(value):
+    """GUIDs of the object references held by a relationship attribute"""
+    if isinstance(value, dict):
+        return [value["guid"]] if "guid" in value else []
+    if isinstance(value, list):
+        return [item["guid"] for item in value if isinstance(item, dict) and "guid" in item]
+    return []
+
+
+class EntityGraph:
+    """
+    In-memory graph of bulk Atlas entities, built in a single pass.
+
+    Entities are indexed by GUID, typeName and qualifiedName (the indexes hold the original
+    dicts, not copies), and relationshipAttributes become outgoing and incoming edges.
+    """
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.by_guid = {}
+        self.by_type = defaultdict(list)
+        self.by_qualified_name = {}
+        self.out_edges = defaultdict(list)
+        self.in_edges = defaultdict(list)
+        self.relationship_count = 0
+
+        for entity in entities:
+            guid = entity.get("guid")
+            type_name = entity.get("typeName", "Unknown")
+            self.by_type[type_name].append(entity)
+            if guid:
+                self.by_guid[guid] = entity
+            qualified_name = entity.get("attributes", {}).get("qualifiedName")
+            if qualified_name:
+                self.by_qualified_name[(type_name, qualified_name)] = entity
+
+            for relation, value in (entity.get("relationshipAttributes") or {}).items():
+                targets = _references(value)
+                self.relationship_count += len(targets) if isinstance(value, list) else 1
+                for target in targets:
+                    self.out_edges[guid].append((relation, target))
+                    self.in_edges[target].append((relation, guid))
+
+        self._used_data_categories = None
+
+    def __len__(self):
+        return len(self.entities)
+
+    @property
+    def entity_counts(self):
+        """Number of entities per typeName, in order of first appearance"""
+        return {type_name: len(entities) for type_name, entities in self.by_type.items()}
+
+    @property
+    def unique_guids(self):
+        return len(self.by_guid)
+
+    def of_type(self, type_name):
+        return self.by_type.get(type_name, [])
+
+    def get(self, guid):
+        return self.by_guid.get(guid)
+
+    def find(self, type_name, qualified_name):
+        return self.by_qualified_name.get((type_name, qualified_name))
+
+    def neighbors(self, guid, relation=None):
+        """Entities referenced by an entity's relationshipAttributes, optionally of one relation"""
+        return [self.by_guid[target] for rel, target in self.out_edges.get(guid, [])
+                if (relation is None or rel == relation) and target in self.by_guid]
+
+    def referrers(self, guid, relation=None):
+        """Entities whose relationshipAttributes reference an entity, optionally through one relation"""
+        return [self.by_guid[source] for rel, source in self.in_edges.get(guid, [])
+                if (relation is None or rel == relation) and source in self.by_guid]
+
+    def used_data_category(self, entity):
+        """Datasets for Action inputs, otherwise the category of the UsedData format"""
+        if any(rel == "inputs" for rel, _ in self.in_edges.get(entity.get("guid"), [])):
+            return "Datasets"
+        return USED_DATA_FORMATS.get(entity.get("attributes", {}).get("format"), "Other")
+
+    def used_data_categories(self):
+        """Number of UsedData entities per category"""
+        if self._used_data_categories is None:
+            counts = {}
+            for entity in self.of_type("UsedData"):
+                category = self.used_data_category(entity)
+                counts[category] = counts.get(category, 0) + 1
+            self._used_data_categories = counts
+        return self._used_data_categories
@@ -0,0 +1,124 @@
+import hashlib
+
+
+# Decimal digits of a placeholder GUID; wide enough that thousands of merged projects do not collide
+GUID_DIGITS = 15
+
+
+def hash_guid(type_name, qualified_name, attempt=0, digits=GUID_DIGITS):
+    """Negative placeholder GUID derived from the entity identity; attempt > 0 gives the rehashes"""
+    key = f"{type_name}:{qualified_name}" if attempt == 0 else f"{type_name}:{qualified_name}#{attempt}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f"-{1 + int(digest, 16) % (10**digits - 1)}"
+
+
+class GuidAllocator:
+    """
+    Allocates placeholder GUIDs for the entities of a batch.
+
+    The GUID of an entity is a hash of its typeName and qualifiedName, so re-running a project
+    gives the same GUIDs. The same entity always gets the same GUID, and two different entities
+    never share one: on a hash collision the later entity is rehashed until a free GUID is found.
+    """
+
+    def __init__(self, digits=GUID_DIGITS):
+        self.digits = digits
+        self._by_key = {}
+        self._by_guid = {}
+
+    def __call__(self, type_name, qualified_name):
+        return self.allocate(type_name, qualified_name)
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def allocate(self, type_name, qualified_name):
+        """GUID of an entity, allocating a new one the first time it is seen"""
+        key = (type_name, qualified_name)
+        if key in self._by_key:
+            return self._by_key[key]
+
+        attempt = 0
+        guid = hash_guid(type_name, qualified_name, attempt, self.digits)
+        while guid in self._by_guid:
+            attempt += 1
+            guid = hash_guid(type_name, qualified_name, attempt, self.digits)
+        return self._assign(key, guid)
+
+    def reserve(self, type_name, qualified_name, guid):
+        """
+        Register an entity that already has a GUID (e.g. read from a bulk file).
+
+        Returns the GUID the entity keeps: its own if free, the one the entity already has if it
+        was seen before, or a newly allocated one if another entity holds it.
+        """
+        key = (type_name, qualified_name)
+        if key in self._by_key:
+            return self._by_key[key]
+        if guid in self._by_guid:
+            return self.allocate(type_name, qualified_name)
+        return self._assign(key, guid)
+
+    def _assign(self, key, guid):
+        self._by_key[key] = guid
+        self._by_guid[guid] = key
+        return guid
+
+
+class MergeConflictError(ValueError):
+    """Two bulk documents define the same entity (typeName and qualifiedName) differently"""
+
+
+def _remap_references(value, mapping):
+    """Copy of an attribute value with the GUIDs of its object references replaced"""
+    if isinstance(value, dict):
+        if "guid" in value and "typeName" in value:
+            return {**value, "guid": mapping.get(value["guid"], value["guid"])}
+        return {k: _remap_references(v, mapping) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_remap_references(v, mapping) for v in value]
+    return value
+
+
+def merge_bulk_documents(documents, allocator=None):
+    """
+    Merge bulk Atlas documents ({"entities": [...]}) into one ingest document.
+
+    An entity present in several documents (same typeName and qualifiedName) is kept once; if
+    the copies have different attributes, MergeConflictError is raised rather than dropping
+    one. GUIDs that clash between different entities are reallocated, and the references of
+    each document are rewritten to the GUIDs its entities ended up with.
+    """
+    if allocator is None:
+        allocator = GuidAllocator()
+    merged = []
+    merged_by_key = {}
+
+    for document in documents:
+        entities = document.get("entities", [])
+        mapping = {}
+        kept = []
+        for entity in entities:
+            qualified_name = entity.get("attributes", {}).get("qualifiedName")
+            key = (entity.get("typeName"), qualified_name)
+            seen = key in allocator
+            guid = allocator.reserve(*key, entity["guid"])
+            if guid != entity["guid"]:
+                mapping[entity["guid"]] = guid
+            kept.append((key, seen, entity))
+
+        for key, seen, entity in kept:
+            if mapping:
+                entity = {k: (mapping.get(v, v) if k == "guid" else _remap_references(v, mapping))
+                          for k, v in entity.items()}
+            if key in merged_by_key:
+                if merged_by_key[key].get("attributes") != entity.get("attributes"):
+                    raise MergeConflictError(f"{key[0]} {key[1]!r} is defined with different attributes")
+            elif not seen:
+                merged_by_key[key] = entity
+                merged.append(entity)
+
+    return {"entities": merged}
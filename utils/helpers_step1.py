@@ -11,6 +11,7 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+from utils.profiling import get_profile
 
 
 ##### STEP 1
@@ -81,43 +82,72 @@ def show_global_score(score, threshold=75):
     ))
     st.plotly_chart(fig, use_container_width=True)
 
+@st.fragment
+def show_quality_score(completeness, uniqueness, outliers, threshold=75):
+    """
+    Weight sliders, weight pie and global score gauge.
+
+    Runs as a fragment: moving a weight slider reruns only this block, reusing the facet
+    metrics already computed for the dataset instead of rerunning the whole page.
+    """
+    c, u, o = show_data_pie()
+
+    global_score = c*completeness/100 + u*uniqueness/100 + o*outliers/100
+    show_global_score(global_score, threshold)
+
 def show_data_sample(df):
     st.markdown("#### Sample of Dataset")
     st.dataframe(df.head())
 
-def show_qualitative_analysis(df, numeric_only=True):
+def show_qualitative_analysis(df, numeric_only=True, summary=None):
     """
     Muestra un resumen estadístico del DataFrame.
     
     Parameters:
         df: pd.DataFrame
         numeric_only: bool, si True solo columnas numéricas
+        summary: pd.DataFrame opcional, resumen ya calculado (p. ej. por el perfil en streaming)
     """
     st.markdown("#### Data Qualitative Analysis")
     
-    if numeric_only:
-        df_summary = df.describe().T  # Transpose for better visualization
+    # Summary with null and unique counts, cached by dataset fingerprint
+    if summary is None:
+        df_summary = get_profile(df, numeric_only)["summary"]
     else:
-        df_summary = df.describe(include='all').T
-
-    # Add count of nulls and unique values
-    df_summary['null_count'] = df.isnull().sum()
-    df_summary['unique_count'] = df.nunique()
-
-    # Round it off to make it look nicer
-    df_summary = df_summary.round(2)
+        df_summary = summary
 
     # Display table in Streamlit
     st.dataframe(df_summary, use_container_width=True)
 
 
 # PLOTS
-def plot_histograms(df, group_size=4, section_title="Column Distributions"):
+def histogram_nbins(col_data):
+    """Number of bins for a column: unique-count rules for discrete data, Freedman–Diaconis otherwise"""
+    unique_vals = col_data.nunique()
+
+    if unique_vals <= 5:
+        return unique_vals
+    elif unique_vals <= 30:
+        return 15
+
+    q75, q25 = np.percentile(col_data, [75 ,25])
+    iqr = q75 - q25
+    bin_width = 2 * iqr * len(col_data) ** (-1/3)
+    data_range = col_data.max() - col_data.min()
+
+    if bin_width <= 0 or data_range == 0:
+        return 10
+    return max(int(np.ceil(data_range / bin_width)), 10)
+
+def plot_histograms(df, group_size=4, section_title="Column Distributions", server_binning=True, max_bins=200):
     """
     Plot histograms for all numeric columns in the dataframe using Plotly + Streamlit.
     - df: pandas DataFrame
     - group_size: number of columns per row
     - section_title: optional markdown title
+    - server_binning: if True, bins are counted with NumPy and only bar traces are sent
+      to the browser, so the figure size does not depend on the number of rows
+    - max_bins: upper bound on the bins of a server-binned histogram
     """
     st.markdown(section_title)
 
@@ -137,7 +167,6 @@ def plot_histograms(df, group_size=4, section_title="Column Distributions"):
 
     for i, col in enumerate(numeric_columns):
         col_data = df[col].dropna()
-        unique_vals = col_data.nunique()
 
         if col_data.min() == col_data.max():
             # Constant column → no histogram
@@ -145,34 +174,33 @@ def plot_histograms(df, group_size=4, section_title="Column Distributions"):
             continue
 
         # Dynamic bin calculation
-        if unique_vals <= 5:
-            nbins = unique_vals
-        elif unique_vals <= 30:
-            nbins = 15
-        else:
-            q75, q25 = np.percentile(col_data, [75 ,25])
-            iqr = q75 - q25
-            bin_width = 2 * iqr * len(col_data) ** (-1/3)
-            data_range = col_data.max() - col_data.min()
-
-            if bin_width <= 0 or data_range == 0:
-                nbins = 10
-            else:
-                nbins = max(int(np.ceil(data_range / bin_width)), 10)
+        nbins = histogram_nbins(col_data)
 
         row_pos = i // total_cols + 1
         col_pos = i % total_cols + 1
 
-        fig.add_trace(
-            go.Histogram(
+        if server_binning:
+            counts, edges = np.histogram(col_data.to_numpy(), bins=min(nbins, max_bins))
+            trace = go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                width=np.diff(edges),
+                customdata=np.column_stack([edges[:-1], edges[1:]]),
+                hovertemplate="[%{customdata[0]:.4g}, %{customdata[1]:.4g}): %{y}<extra></extra>",
+                marker_color='skyblue',
+                marker_line=dict(color='black', width=1),
+                name=col
+            )
+        else:
+            trace = go.Histogram(
                 x=col_data,
                 nbinsx=nbins,
                 marker_color='skyblue',
                 marker_line=dict(color='black', width=1),
                 name=col
-            ),
-            row=row_pos, col=col_pos
-        )
+            )
+
+        fig.add_trace(trace, row=row_pos, col=col_pos)
 
     fig.update_layout(
         showlegend=False,
@@ -182,16 +210,22 @@ def plot_histograms(df, group_size=4, section_title="Column Distributions"):
 
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_boxplots(df, group_size=4, section_title="Column Boxplots"):
+def plot_boxplots(df, group_size=4, section_title="Column Boxplots", summary_stats=True):
     """
     Plot boxplots for all numeric columns in the dataframe using Plotly + Streamlit.
     - df: pandas DataFrame
     - group_size: number of columns per row
     - section_title: optional markdown title
+    - summary_stats: if True, boxes are drawn from the quartiles and whiskers of the cached
+      dataset profile and only a sample of the outliers is sent to the browser
     """
     st.markdown(section_title)
 
     numeric_columns = df.select_dtypes(include=['number']).columns
+    if summary_stats:
+        stats = get_profile(df)["box_stats"]
+        # Columns without any value have no box to draw
+        numeric_columns = [col for col in numeric_columns if stats[col] is not None]
     if len(numeric_columns) == 0:
         st.info("No numeric columns to plot.")
         return
@@ -207,6 +241,40 @@ def plot_boxplots(df, group_size=4, section_title="Column Boxplots"):
     )
 
     for i, col in enumerate(numeric_columns):
+        row_pos = i // total_cols + 1
+        col_pos = i % total_cols + 1
+
+        if summary_stats:
+            col_stats = stats[col]
+            name = f"{col} ({col_stats['n_outliers']} outliers)"
+
+            fig.add_trace(
+                go.Box(
+                    x=[name],
+                    q1=[col_stats["q1"]],
+                    median=[col_stats["median"]],
+                    q3=[col_stats["q3"]],
+                    lowerfence=[col_stats["lowerfence"]],
+                    upperfence=[col_stats["upperfence"]],
+                    marker_color='lightblue',
+                    line_color='deepskyblue',
+                    name=name
+                ),
+                row=row_pos, col=col_pos
+            )
+            if len(col_stats["outliers"]) > 0:
+                fig.add_trace(
+                    go.Scatter(
+                        x=[name] * len(col_stats["outliers"]),
+                        y=col_stats["outliers"],
+                        mode='markers',
+                        marker=dict(color='lightblue', line=dict(color='deepskyblue', width=1)),
+                        name=name
+                    ),
+                    row=row_pos, col=col_pos
+                )
+            continue
+
         col_data = df[col].dropna()
 
         # Detect outliers
@@ -218,9 +286,6 @@ def plot_boxplots(df, group_size=4, section_title="Column Boxplots"):
         outliers = col_data[(col_data < lower_bound) | (col_data > upper_bound)]
         n_outliers = len(outliers)
 
-        row_pos = i // total_cols + 1
-        col_pos = i % total_cols + 1
-
         fig.add_trace(
             go.Box(
                 y=col_data,
@@ -239,5 +304,3 @@ def plot_boxplots(df, group_size=4, section_title="Column Boxplots"):
     )
 
     st.plotly_chart(fig, use_container_width=True)
-
-
@@ -3,7 +3,11 @@ import plotly.express as px
 import pandas as pd
 import json
 import time
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.notebook_extractor import find_notebook, get_notebook_insights
+from utils.log_analyzer import find_log, analyze_log
+from utils.asset_cache import load_json_asset
 
 def get_project_paths(proyecto):
     """Get file paths based on project selection"""
@@ -18,76 +22,103 @@ def get_project_paths(proyecto):
         "log_analysis": f"{base_path}/log_analysis.json",
         "kernel_metadata": f"{base_path}/kernel_metadata.json",
         "insights_notebook": f"{base_path}/insights_notebook.json",
-        "entities_kaggle": f"{base_path}/entities_kaggle.json"
+        "entities_kaggle": f"{base_path}/entities_kaggle.json",
+        "notebook": find_notebook(base_path),
+        "log": find_log(base_path)
     }
 
 
-def load_json_file(file_path, default_data=None):
-    """Safely load JSON file with error handling"""
+def extract_project_metadata(paths):
+    return load_json_asset(paths["kernel_metadata"])
+
+
+def extract_notebook_insights(paths):
+    if paths.get("notebook"):
+        return get_notebook_insights(paths["notebook"])
+    return load_json_asset(paths["insights_notebook"])
+
+
+def extract_outputs(paths):
+    if paths.get("log"):
+        return analyze_log(paths["log"])
+    return load_json_asset(paths["log_analysis"])
+
+
+# Step 2 sources in display order: (key in the extracted data, section title, extractor)
+EXTRACTION_SOURCES = {
+    "metadata": ("project_metadata", "📋 Project Metadata Extraction Results", extract_project_metadata),
+    "notebook": ("notebook_insights", "📓 Notebook Extraction Results", extract_notebook_insights),
+    "outputs": ("output_analysis", "📊 Output Extraction Results", extract_outputs),
+}
+
+
+# Sources whose extractor goes through a Streamlit cache: they run in the script thread, which
+# holds the ScriptRunContext, after the pool's sources have been rendered
+SCRIPT_THREAD_SOURCES = {"notebook"}
+
+
+def _timed(extractor, paths):
+    start = time.perf_counter()
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            st.warning(f"File not found: {file_path}")
-            return default_data if default_data else {}
+        return extractor(paths), None, time.perf_counter() - start
     except Exception as e:
-        st.error(f"Error loading {file_path}: {str(e)}")
-        return default_data if default_data else {}
+        return {}, e, time.perf_counter() - start
 
 
 def show_extraction_process(notebook, metadata, outputs, proyecto, paths):
-    """Show the interactive extraction process with real data"""
+    """
+    Show the extraction process with real data.
+
+    The plain sources are extracted concurrently in a thread pool that never calls Streamlit, and
+    each of their sections is rendered (from the script thread) as soon as its source completes.
+    The cached notebook extraction needs the script thread, so it runs last: rendering the pool's
+    sections never waits for it, and on a cache hit it only costs the file hash.
+    """
     
     st.subheader("Extraction in Progress...")
     
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
+    selected = {"metadata": metadata, "notebook": notebook, "outputs": outputs}
+    sources = [source for source in EXTRACTION_SOURCES if selected[source]]
+    views = {
+        "metadata": show_project_metadata_results,
+        "notebook": show_notebook_results,
+        "outputs": show_output_results,
+    }
+
+    progress_bar = st.progress(0, text=f"Extracting {len(sources)} sources concurrently...")
+    sections = {}
+    for source in sources:
+        st.subheader(EXTRACTION_SOURCES[source][1])
+        sections[source] = st.empty()
+        sections[source].info("Extracting...")
+
     extracted_data = {}
-    step = 0
-    total_steps = sum([notebook, metadata, outputs])
-    
-    # Project Metadata extraction
-    if metadata:
-        step += 1
-        progress_bar.progress(step / total_steps)
-        status_text.text(f"Extracting project metadata... ({step}/{total_steps})")
-        time.sleep(1)
-        
-        st.subheader("📋 Project Metadata Extraction Results")
-        metadata_data = load_json_file(paths["kernel_metadata"])
-        extracted_data['project_metadata'] = metadata_data
-        show_project_metadata_results(metadata_data)
-    
-    # Notebook extraction
-    if notebook:
-        step += 1
-        progress_bar.progress(step / total_steps)
-        status_text.text(f"Extracting notebook insights... ({step}/{total_steps})")
-        time.sleep(1)
-        
-        st.subheader("📓 Notebook Extraction Results")
-        notebook_data = load_json_file(paths["insights_notebook"])
-        extracted_data['notebook_insights'] = notebook_data
-        show_notebook_results(notebook_data)
-    
-    # Outputs extraction
-    if outputs:
-        step += 1
-        progress_bar.progress(step / total_steps)
-        status_text.text(f"Extracting execution outputs... ({step}/{total_steps})")
-        time.sleep(1)
-        
-        st.subheader("📊 Output Extraction Results")
-        output_data = load_json_file(paths["log_analysis"])
-        extracted_data['output_analysis'] = output_data
-        show_output_results(output_data)
-    
-    # Completion
-    progress_bar.progress(1.0)
-    status_text.text("Extraction completed successfully!")
+    start = time.perf_counter()
+    pooled = [source for source in sources if source not in SCRIPT_THREAD_SOURCES]
+    with ThreadPoolExecutor(max_workers=max(len(pooled), 1)) as executor:
+        futures = {executor.submit(_timed, EXTRACTION_SOURCES[source][2], paths): source for source in pooled}
+
+        def results():
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+            for source in sources:
+                if source in SCRIPT_THREAD_SOURCES:
+                    yield source, _timed(EXTRACTION_SOURCES[source][2], paths)
+
+        for done, (source, (data, error, seconds)) in enumerate(results(), 1):
+            extracted_data[EXTRACTION_SOURCES[source][0]] = data
+
+            with sections[source].container():
+                if isinstance(error, FileNotFoundError):
+                    st.warning(f"File not found: {error.filename}")
+                elif error is not None:
+                    st.error(f"Error extracting {source}: {str(error)}")
+                views[source](data)
+                st.caption(f"⏱️ Extracted in {seconds * 1000:.1f} ms")
+            progress_bar.progress(done / len(sources), text=f"Extracted {source} ({done}/{len(sources)})")
+
+    elapsed = time.perf_counter() - start
+    progress_bar.progress(1.0, text=f"Extraction completed successfully in {elapsed * 1000:.1f} ms")
 
     # Show consolidated results ONLY if all 3 sources were extracted
     if notebook and metadata and outputs:
@@ -213,6 +244,17 @@ def show_output_results(data):
         st.markdown(f"**Encoding:** {file_info.get('encoding', 'N/A')}")
         st.markdown(f"**Path:** `{file_info.get('filepath', 'N/A')}`")
 
+        # Present when the log itself was analyzed (utils.log_analyzer)
+        if data.get('output_files'):
+            st.markdown("**Files produced by the run:**")
+            for output_file in data['output_files']:
+                st.markdown(f"• `{output_file.get('path', 'N/A')}`")
+        for label, key in (("Warnings", "warnings"), ("Errors", "errors")):
+            categories = data.get(key, {}).get('categories')
+            if categories:
+                summary = ", ".join(f"{category} ×{count}" for category, count in categories.items())
+                st.markdown(f"**{label}:** {summary}")
+
 
 def show_consolidated_metadata(extracted_data, proyecto, paths):
     """Show the consolidated metadata results"""
@@ -226,13 +268,14 @@ def show_consolidated_metadata(extracted_data, proyecto, paths):
     """)
     
     tab1, tab2 = st.tabs(["Summary View", "Download JSON"])
+
+    # Load the entities-kaggle.json file once for both tabs
+    entities_data = load_json_asset(paths["entities_kaggle"], default={})
     
     with tab1:
-        show_metamodel_summary(extracted_data, paths)
+        show_metamodel_summary(entities_data)
     
     with tab2:
-        # Load and display the entities-kaggle.json file
-        entities_data = load_json_file(paths["entities_kaggle"])
         
         if entities_data:
             json_str = json.dumps(entities_data, indent=2)
@@ -252,12 +295,9 @@ def show_consolidated_metadata(extracted_data, proyecto, paths):
 
 
 
-def show_metamodel_summary(data, paths):
+def show_metamodel_summary(entities_data):
     """Show a summary of the metamodel structure with entity mapping"""
     
-    # Load the entities-kaggle.json data dynamically
-    entities_data = load_json_file(paths["entities_kaggle"])
-    
     if not entities_data:
         st.warning("No entities data available for metamodel summary")
         return
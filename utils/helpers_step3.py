@@ -1,9 +1,29 @@
 import streamlit as st
-import json
-import time
+import os
 import pandas as pd
 from datetime import datetime
-import uuid
+
+from utils.datasets import get_dataset, dataset_path, is_large_dataset
+from utils.profiling import get_profile
+from utils.streaming_profile import get_streaming_profile
+from utils.cleaning import clean_dataset, RETAIL_CLEANING_STEPS
+from utils.quality import global_quality_score, quality_issues, QUALITY_THRESHOLD
+from utils.transformation import transform_project
+from utils.entity_graph import EntityGraph
+from utils.json_export import json_bytes, chunks_zip, json_preview
+from utils.query_cache import QueryResultCache, entity_version
+from utils.asset_cache import load_json_asset
+from utils.notebook_extractor import find_notebook, get_notebook_insights, code_line
+from utils.delta_transform import transform_delta, delta_summary, load_snapshot, save_snapshot, snapshot_start_date
+
+# Last transformed entities of each project, compared by the next Step 3 run
+SNAPSHOT_DIR = "assets/jsons/rpcm_snapshots"
+
+# Cleaning pipeline applied to a project dataset whose quality score is below the threshold or
+# whose facets found problems (the cleaning Step 1 offers)
+CLEANING_PIPELINES = {
+    "Retail Data Analytics": RETAIL_CLEANING_STEPS,
+}
 
 def get_project_paths(proyecto):
     """Get file paths based on project selection"""
@@ -13,20 +33,44 @@ def get_project_paths(proyecto):
     }
     
     project_folder = project_mapping.get(proyecto, "student")
-    base_path = f"assets/jsons/metatada_extraction/{project_folder}"
+    base_path = f"assets/jsons/metadata_extraction/{project_folder}"
     
     return {
-        "entities_kaggle": f"{base_path}/entities-kaggle.json",
-        "entities_bulk_atlas": f"{base_path}/entities_bulk_atlas.json"
+        "entities_kaggle": f"{base_path}/entities_kaggle.json",
+        "entities_bulk_atlas": f"{base_path}/entities_bulk_atlas.json",
+        "rpcm_snapshot": f"{SNAPSHOT_DIR}/{project_folder}.json",
+        "notebook": find_notebook(base_path)
     }
 
-def load_json_file(file_path):
-    """Safely load JSON file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return None
+def load_kaggle_entities(paths):
+    """
+    Kaggle entities of the project, or None if they are missing.
+
+    When the project notebook is next to them, its CodeLine (models and graphs) is taken from
+    the notebook insights of Step 2, so the outputs follow the notebook rather than a stale copy.
+    """
+    kaggle_entities = load_json_asset(paths["entities_kaggle"], default=None)
+    if kaggle_entities and paths.get("notebook"):
+        try:
+            insights = get_notebook_insights(paths["notebook"])
+        except (OSError, ValueError):
+            return kaggle_entities
+        kaggle_entities = {**kaggle_entities, "CodeLine": code_line(insights)}
+    return kaggle_entities
+
+def get_start_date(paths, kaggle_entities, snapshot):
+    """
+    Project start date (epoch milliseconds): the document's Project.startDate, else the one of
+    the last ingested snapshot, else (first run) the modification time of the Kaggle entities.
+
+    Touching or re-extracting the file then does not change the Project of later deltas.
+    """
+    start_date = kaggle_entities.get("Project", {}).get("startDate")
+    if start_date is None:
+        start_date = snapshot_start_date(snapshot)
+    if start_date is None:
+        start_date = int(os.path.getmtime(paths["entities_kaggle"]) * 1000)
+    return start_date
 
 def show_transformation_overview():
     """Show the transformation rules overview"""
@@ -66,118 +110,187 @@ def show_transformation_overview():
     relationship_df = pd.DataFrame(relationship_data)
     st.dataframe(relationship_df, hide_index=True, use_container_width=True)
 
+def get_dataset_quality(proyecto):
+    """Step 1 quality score of the project dataset, keyed by file name, and whether it had to be cleaned"""
+    path = dataset_path(proyecto)
+    if is_large_dataset(proyecto):
+        quality = get_streaming_profile(path, os.path.getmtime(path)).quality()
+    else:
+        quality = get_profile(get_dataset(proyecto))["quality"]
+
+    score = global_quality_score(quality)
+    cleaned = False
+    needs_cleaning = score < QUALITY_THRESHOLD or quality_issues(quality)
+    if needs_cleaning and proyecto in CLEANING_PIPELINES and not is_large_dataset(proyecto):
+        cleaning = clean_dataset(get_dataset(proyecto), CLEANING_PIPELINES[proyecto])
+        score = global_quality_score(cleaning["quality"])
+        cleaned = True
+
+    return {os.path.basename(path): {"score": score, "cleaned": cleaned}}
+
+@st.cache_resource
+def get_query_cache():
+    """Query result cache shared by every session; Step 3 publishes the entities it generates into it"""
+    return QueryResultCache()
+
+def generate_rpcm_entities(proyecto, progress=None):
+    """Transform the project's Kaggle entities into bulk Atlas entities, or None if they are missing"""
+    def report(fraction, label):
+        if progress is not None:
+            progress(fraction, label)
+
+    report(0.0, "Analyzing Kaggle entities")
+    paths = get_project_paths(proyecto)
+    kaggle_entities = load_kaggle_entities(paths)
+    if not kaggle_entities:
+        return None
+
+    report(0.0, "Assessing dataset quality")
+    dataset_quality = get_dataset_quality(proyecto)
+
+    return transform_project(
+        kaggle_entities,
+        dataset_quality=dataset_quality,
+        start_date=get_start_date(paths, kaggle_entities, load_snapshot(paths["rpcm_snapshot"])),
+        progress=progress,
+    )
+
+def generate_rpcm_delta(proyecto, progress=None):
+    """
+    Transform the project incrementally against the snapshot of its last ingest.
+
+    Returns (bulk Atlas entities, delta, new snapshot), or None if the Kaggle entities are
+    missing. The snapshot is not saved here: it only becomes the baseline once the delta has
+    been marked as ingested, so running the transformation again does not lose the delta.
+    """
+    paths = get_project_paths(proyecto)
+    kaggle_entities = load_kaggle_entities(paths)
+    if not kaggle_entities:
+        return None
+
+    previous = load_snapshot(paths["rpcm_snapshot"])
+    atlas_entities, delta, snapshot = transform_delta(
+        kaggle_entities,
+        previous,
+        dataset_quality=get_dataset_quality(proyecto),
+        start_date=get_start_date(paths, kaggle_entities, previous),
+        progress=progress,
+    )
+    return atlas_entities, delta, snapshot
+
+def mark_delta_ingested(proyecto, snapshot):
+    """Make the transformed entities the baseline of the next delta (button callback)"""
+    try:
+        save_snapshot(snapshot, get_project_paths(proyecto)["rpcm_snapshot"])
+        st.toast("Delta marked as ingested: the next transformation is compared with these entities.")
+    except OSError as e:
+        st.toast(f"Could not save the transformation snapshot: {str(e)}")
+
 def show_transformation_process(proyecto):
-    """Show the step-by-step transformation process"""
+    """Run the transformation rules over the Kaggle entities, reporting progress as each rule completes"""
     
     st.subheader("Transformation in Progress...")
     
     # Progress tracking
     progress_bar = st.progress(0)
     status_text = st.empty()
-    
-    # Simulate transformation steps
-    transformation_steps = [
-        ("Analyzing Kaggle entities", 0.1),
-        ("Generating RPCM Project structure", 0.25),
-        ("Creating User and Process entities", 0.4),
-        ("Transforming data entities", 0.6),
-        ("Building Action workflows", 0.8),
-        ("Establishing entity relationships", 0.95),
-        ("Finalizing RPCM entities", 1.0)
-    ]
-    
-    for step_name, progress in transformation_steps:
-        progress_bar.progress(progress)
-        status_text.text(step_name)
-        time.sleep(0.8)
-    
+
+    def report(fraction, label):
+        progress_bar.progress(fraction)
+        status_text.text(label)
+
+    result = generate_rpcm_delta(proyecto, progress=report)
+    if result is None:
+        st.error("Could not load the Kaggle entities. Please run the metadata extraction first.")
+        return
+    atlas_entities, delta, snapshot = result
+    
+    # New entities invalidate the Step 4 query results of this project
+    version = get_query_cache().publish(proyecto, atlas_entities["entities"])
+
     status_text.text("Transformation completed successfully!")
+    show_delta_results(delta, snapshot, proyecto)
+    show_transformation_results(atlas_entities, proyecto, version)
+
+def show_delta_results(delta, snapshot, proyecto):
+    """Show which RPCM entities changed since the last ingest of the project"""
     
-    if proyecto == "Student Performance Analysis":
-        atlas_entities = load_json_file("assets/jsons/atlas_entities/student_entities_bulk_atlas.json")
-    elif proyecto == "Retail Data Analytics":
-        atlas_entities = load_json_file("assets/jsons/atlas_entities/retail_entities_bulk_atlas.json")
+    summary = delta_summary(delta)
+    st.markdown("---")
+    st.subheader("Changes Since the Last Ingest")
 
-    if atlas_entities:
-        show_transformation_results(atlas_entities, proyecto)
-    else:
-        st.error("Could not load RPCM entities. Please ensure the transformation files are available.")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Created", summary["created"])
+    with col2:
+        st.metric("Updated", summary["updated"])
+    with col3:
+        st.metric("Deleted", summary["deleted"])
+    with col4:
+        st.metric("Unchanged", summary["unchanged"])
+
+    if not any(summary[key] for key in ("created", "updated", "deleted")):
+        st.caption("No RPCM entity changed since the last ingest: nothing needs to be sent to Atlas.")
+        return
+    if delta["rebuilt_rules"]:
+        st.caption(f"Transformation rules re-run: {', '.join(delta['rebuilt_rules'])}")
+
+    st.download_button(
+        label="⬇️ Download RPCM Delta",
+        data=json_bytes(delta, indent=2),
+        file_name=f"{proyecto.lower().replace(' ', '_')}_rpcm_delta.json",
+        mime="application/json",
+        use_container_width=True
+    )
+    st.button(
+        "✅ Mark Delta as Ingested",
+        on_click=mark_delta_ingested,
+        args=(proyecto, snapshot),
+        help="Use these entities as the baseline of the next delta",
+        use_container_width=True
+    )
 
 def analyze_rpcm_entities(atlas_entities):
-    """Analyze the RPCM entities and extract key information"""
-    
-    entities_list = atlas_entities.get("entities", [])
-    
-    # Count entities by type
-    entity_counts = {}
-    entity_details = {}
-    
-    for entity in entities_list:
-        entity_type = entity.get("typeName", "Unknown")
-        entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
-        
-        if entity_type not in entity_details:
-            entity_details[entity_type] = []
-        entity_details[entity_type].append(entity)
-    
-    # Count relationships
-    total_relationships = 0
-    for entity in entities_list:
-        if entity.get("relationshipAttributes"):
-            for rel_type, rel_list in entity["relationshipAttributes"].items():
-                if isinstance(rel_list, list):
-                    total_relationships += len(rel_list)
-                else:
-                    total_relationships += 1
-    
-    # Get unique GUIDs
-    unique_guids = len(set(entity.get("guid") for entity in entities_list if entity.get("guid")))
-    
-    return {
-        "entity_counts": entity_counts,
-        "entity_details": entity_details,
-        "total_relationships": total_relationships,
-        "unique_guids": unique_guids,
-        "total_entities": len(entities_list)
-    }
+    """Index the RPCM entities in a single pass"""
+    return EntityGraph(atlas_entities.get("entities", []))
 
-def show_transformation_results(atlas_entities, proyecto):
+def show_transformation_results(atlas_entities, proyecto, version=None):
     """Display the transformation results using real RPCM data"""
     
     st.markdown("---")
     st.subheader("Transformation Results")
     
-    # Analyze the real entities
-    analysis = analyze_rpcm_entities(atlas_entities)
+    # Index the real entities
+    graph = analyze_rpcm_entities(atlas_entities)
     
     # Summary metrics using real data
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Entities", analysis["total_entities"])
+        st.metric("Total Entities", len(graph))
     
     with col2:
-        st.metric("Entity Types", len(analysis["entity_counts"]))
+        st.metric("Entity Types", len(graph.by_type))
     
     with col3:
-        st.metric("Relationships", analysis["total_relationships"])
+        st.metric("Relationships", graph.relationship_count)
     
     with col4:
-        st.metric("Unique GUIDs", analysis["unique_guids"])
+        st.metric("Unique GUIDs", graph.unique_guids)
     
     # Detailed results in tabs
     tab1, tab2, tab3 = st.tabs(["Entity Analysis", "RPCM Structure", "Download Results"])
     
     with tab1:
-        show_entity_analysis_results(analysis)
+        show_entity_analysis_results(graph)
     
     with tab2:
-        show_rpcm_structure_results(analysis)
+        show_rpcm_structure_results(graph)
     
     with tab3:
-        show_download_results(atlas_entities, proyecto)
+        show_download_results(atlas_entities, proyecto, graph, version)
 
-def show_entity_analysis_results(analysis):
+def show_entity_analysis_results(graph):
     """Show detailed entity analysis from real RPCM data"""
     
     st.markdown("### Generated RPCM Entities")
@@ -187,13 +300,14 @@ def show_entity_analysis_results(analysis):
     
     with col1:
         st.markdown("**Entity Counts by Type**")
-        for entity_type, count in analysis["entity_counts"].items():
+        entity_counts = graph.entity_counts
+        for entity_type, count in entity_counts.items():
             st.markdown(f"• **{entity_type}**: {count}")
     
     with col2:
         st.markdown("**Entity Distribution**")
         # Create a simple chart showing entity distribution
-        entity_df = pd.DataFrame(list(analysis["entity_counts"].items()), 
+        entity_df = pd.DataFrame(list(entity_counts.items()), 
                                 columns=["Entity Type", "Count"])
         st.bar_chart(entity_df.set_index("Entity Type"))
     
@@ -201,8 +315,9 @@ def show_entity_analysis_results(analysis):
     st.markdown("### Example Entity")
     
     # Show details for key entity types
-    for entity_type, entities in analysis["entity_details"].items():
-        if entity_type in ["User", "Project", "Action"]:  # Show details for key entities
+    for entity_type in ["User", "Project", "Action"]:  # Show details for key entities
+        entities = graph.of_type(entity_type)
+        if entities:
             with st.container(border=True):
                 st.markdown(f"**{entity_type} Entities ({len(entities)})**")
                 
@@ -228,14 +343,14 @@ def show_entity_analysis_results(analysis):
                         st.markdown(f"  - Input: {input_data}")
                         st.markdown(f"  - Output: {output_data}")
 
-def show_rpcm_structure_results(analysis):
+def show_rpcm_structure_results(graph):
     """Show the RPCM structure and relationships using real data"""
     
     st.markdown("### RPCM Entity Structure")
     
     # Find key entities for context
-    user_entities = analysis["entity_details"].get("User", [])
-    project_entities = analysis["entity_details"].get("Project", [])
+    user_entities = graph.of_type("User")
+    project_entities = graph.of_type("Project")
     
     user_name = "Unknown"
     project_name = "Unknown Project"
@@ -251,58 +366,69 @@ def show_rpcm_structure_results(analysis):
         st.markdown("**Project Context**")
         st.markdown(f"• **Project**: {project_name}")
         st.markdown(f"• **Owner**: {user_name}")
-        st.markdown(f"• **Total Entities**: {analysis['total_entities']}")
-        st.markdown(f"• **Entity Types**: {len(analysis['entity_counts'])}")
+        st.markdown(f"• **Total Entities**: {len(graph)}")
+        st.markdown(f"• **Entity Types**: {len(graph.by_type)}")
     
     # Entity hierarchy with real counts
     with st.container(border=True):
         st.markdown("**Entity Hierarchy (Real Counts)**")
+        counts = graph.entity_counts
         
         hierarchy_text = f"""
 ```
-Project ({analysis['entity_counts'].get('Project', 0)})
-├── Experiment ({analysis['entity_counts'].get('Experiment', 0)})
-│   ├── Stage ({analysis['entity_counts'].get('Stage', 0)})
-│   │   └── Iteration ({analysis['entity_counts'].get('Iteration', 0)})
-│   │       └── Action ({analysis['entity_counts'].get('Action', 0)})
-│   │           ├── UsedData ({analysis['entity_counts'].get('UsedData', 0)})
-│   │           └── Consensus ({analysis['entity_counts'].get('Consensus', 0)})
-│   └── Workgroup ({analysis['entity_counts'].get('Workgroup', 0)})
-└── User ({analysis['entity_counts'].get('User', 0)})
+Project ({counts.get('Project', 0)})
+├── Experiment ({counts.get('Experiment', 0)})
+│   ├── Stage ({counts.get('Stage', 0)})
+│   │   └── Iteration ({counts.get('Iteration', 0)})
+│   │       └── Action ({counts.get('Action', 0)})
+│   │           ├── UsedData ({counts.get('UsedData', 0)})
+│   │           └── Consensus ({counts.get('Consensus', 0)})
+│   └── Workgroup ({counts.get('Workgroup', 0)})
+└── User ({counts.get('User', 0)})
 ```"""
         st.markdown(hierarchy_text)
     
     # UsedData breakdown
-    if "UsedData" in analysis["entity_details"]:
+    if graph.of_type("UsedData"):
         with st.container(border=True):
             st.markdown("**UsedData Breakdown**")
             
-            useddata_entities = analysis["entity_details"]["UsedData"]
-            data_types = {}
-            
-            for entity in useddata_entities:
-                attributes = entity.get("attributes", {})
-                name = attributes.get("name", "")
-                
-                if "Dataset" in name:
-                    data_types["Datasets"] = data_types.get("Datasets", 0) + 1
-                elif "Model:" in name:
-                    data_types["ML Models"] = data_types.get("ML Models", 0) + 1
-                elif "Chart:" in name:
-                    data_types["Visualizations"] = data_types.get("Visualizations", 0) + 1
-                elif "Notebook:" in name:
-                    data_types["Notebooks"] = data_types.get("Notebooks", 0) + 1
-                elif "Log:" in name:
-                    data_types["Logs"] = data_types.get("Logs", 0) + 1
-                else:
-                    data_types["Other"] = data_types.get("Other", 0) + 1
-            
-            for data_type, count in data_types.items():
+            for data_type, count in graph.used_data_categories().items():
                 st.markdown(f"• **{data_type}**: {count}")
 
-def show_download_results(atlas_entities, proyecto):
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_entities_download(version, compress, _atlas_entities):
+    """Serialized bulk document, built once per entity version rather than on every rerun"""
+    return json_bytes(_atlas_entities, indent=None if compress else 2, compress=compress)
+
+@st.cache_data(max_entries=16, show_spinner="Packing chunks...")
+def get_chunks_download(version, ndjson, _entities):
+    """Zipped chunks of the entities, built on request and once per entity version"""
+    return chunks_zip(_entities, ndjson=ndjson)
+
+@st.fragment
+def show_chunk_downloads(entities, proyecto, version):
+    """
+    Dependency-ordered chunks plus manifest, for bounded and resumable Atlas ingestion.
+
+    The archives are only packed when asked for; the toggle reruns just this fragment.
+    """
+    if st.toggle("Prepare chunked archives", key=f"chunks_{version}"):
+        for label, ndjson in [("📦 Download Chunked Bulk (zip)", False), ("📦 Download Chunked NDJSON (zip)", True)]:
+            st.download_button(
+                label=label,
+                data=get_chunks_download(version, ndjson, entities),
+                file_name=f"{proyecto.lower().replace(' ', '_')}_rpcm_entities_{'ndjson' if ndjson else 'json'}_chunks.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+
+def show_download_results(atlas_entities, proyecto, graph=None, version=None):
     """Show download options for transformation results"""
     
+    if version is None:
+        version = entity_version(atlas_entities.get("entities", []))
+    
     entities_count = len(atlas_entities.get("entities", []))
     st.markdown(f"**{entities_count} RPCM entities ready for Atlas ingestion**")
     
@@ -312,45 +438,53 @@ def show_download_results(atlas_entities, proyecto):
         "note": f"Showing 3 of {entities_count} entities. Download full file above."
     }
     
-    st.code(json.dumps(preview_data, indent=2)[:1000] + "...", language="json")
+    st.code(json_preview(preview_data, indent=2, max_chars=1000), language="json")
 
     st.markdown("### Download Transformation Results")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        # Download RPCM entities (real data)
-        rpcm_json = json.dumps(atlas_entities, indent=2)
+        # Download RPCM entities (real data); payloads are cached per entity version
         st.download_button(
             label="⬇️ Download RPCM Entities",
-            data=rpcm_json,
+            data=get_entities_download(version, False, atlas_entities),
             file_name=f"{proyecto.lower().replace(' ', '_')}_rpcm_entities.json",
             mime="application/json",
             use_container_width=True
         )
+        st.download_button(
+            label="🗜️ Download RPCM Entities (compact, gzip)",
+            data=get_entities_download(version, True, atlas_entities),
+            file_name=f"{proyecto.lower().replace(' ', '_')}_rpcm_entities.json.gz",
+            mime="application/gzip",
+            use_container_width=True
+        )
+        show_chunk_downloads(atlas_entities.get("entities", []), proyecto, version)
     
     with col2:
         # Create transformation summary report
-        analysis = analyze_rpcm_entities(atlas_entities)
+        if graph is None:
+            graph = analyze_rpcm_entities(atlas_entities)
         
         transformation_report = {
             "transformation_report": {
                 "project": proyecto,
                 "timestamp": datetime.now().isoformat(),
                 "summary": {
-                    "total_entities": analysis["total_entities"],
-                    "entity_types": len(analysis["entity_counts"]),
-                    "relationships": analysis["total_relationships"],
-                    "unique_guids": analysis["unique_guids"]
+                    "total_entities": len(graph),
+                    "entity_types": len(graph.by_type),
+                    "relationships": graph.relationship_count,
+                    "unique_guids": graph.unique_guids
                 },
-                "entity_counts": analysis["entity_counts"]
+                "entity_counts": graph.entity_counts,
+                "used_data": graph.used_data_categories()
             }
         }
         
-        report_json = json.dumps(transformation_report, indent=2)
         st.download_button(
             label="📊 Download Transformation Report",
-            data=report_json,
+            data=json_bytes(transformation_report, indent=2),
             file_name=f"{proyecto.lower().replace(' ', '_')}_transformation_report.json",
             mime="application/json",
             use_container_width=True
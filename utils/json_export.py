@@ -0,0 +1,216 @@
+import gzip
+import io
+import json
+import zipfile
+
+
+# gzip level of compressed exports; higher levels barely shrink JSON further but cost much more time
+GZIP_LEVEL = 6
+
+# Default limits of a chunk in chunked exports, kept well below typical Atlas request size limits
+CHUNK_MAX_ENTITIES = 1000
+CHUNK_MAX_BYTES = 4 * 1024 * 1024
+
+
+def iter_json(document, indent=None):
+    """
+    Serialize a JSON object piece by piece.
+
+    Top-level lists (e.g. the "entities" of a bulk document) are emitted one item at a time,
+    so the full text never exists in memory. The output matches json.dumps with the same
+    indent (compact separators when indent is None).
+    """
+    key_sep = ":" if indent is None else ": "
+    separators = (",", key_sep)
+    newline = "" if indent is None else "\n"
+    pad = "" if indent is None else " " * indent
+
+    def dumps(value, level):
+        text = json.dumps(value, indent=indent, separators=separators, ensure_ascii=False)
+        return text.replace("\n", "\n" + pad * level) if indent is not None else text
+
+    yield "{"
+    for i, (key, value) in enumerate(document.items()):
+        yield ("," if i else "") + newline + pad + json.dumps(key, ensure_ascii=False) + key_sep
+        if isinstance(value, list) and value:
+            yield "["
+            for j, item in enumerate(value):
+                yield ("," if j else "") + newline + pad * 2 + dumps(item, 2)
+            yield newline + pad + "]"
+        else:
+            yield dumps(value, 1)
+    yield (newline if document else "") + "}"
+
+
+def write_json(document, file, indent=None):
+    """Write a JSON object incrementally to a binary file object"""
+    for chunk in iter_json(document, indent):
+        file.write(chunk.encode("utf-8"))
+
+
+def json_bytes(document, indent=None, compress=False):
+    """Serialized JSON object as bytes, optionally gzip-compressed (the payload of a download)"""
+    buffer = io.BytesIO()
+    if compress:
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as target:
+            write_json(document, target, indent)
+    else:
+        write_json(document, buffer, indent)
+    return buffer.getvalue()
+
+
+def json_preview(document, indent=2, max_chars=1000):
+    """First max_chars characters of the serialized object, without serializing the rest"""
+    text = ""
+    for chunk in iter_json(document, indent):
+        text += chunk
+        if len(text) >= max_chars:
+            return text[:max_chars] + "..."
+    return text
+
+
+def entity_references(entity):
+    """GUIDs referenced by an entity's attributes and relationshipAttributes"""
+    references = []
+    stack = [entity.get("attributes", {}), entity.get("relationshipAttributes", {})]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if "guid" in value and "typeName" in value:
+                references.append(value["guid"])
+            else:
+                stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return references
+
+
+def dependency_order(entities):
+    """
+    Group entities so every group only references itself and earlier groups.
+
+    Groups are the strongly connected components of the reference graph (e.g. a Project and the
+    Experiment that point at each other), emitted dependencies first by Tarjan's algorithm.
+    Entities keep their input order within a group, and groups are never split by chunking.
+    """
+    index_of = {entity["guid"]: i for i, entity in enumerate(entities) if "guid" in entity}
+    edges = [sorted({index_of[ref] for ref in entity_references(entity) if ref in index_of})
+             for entity in entities]
+
+    order = [None] * len(entities)
+    low = [0] * len(entities)
+    on_stack = [False] * len(entities)
+    stack = []
+    groups = []
+    counter = 0
+
+    for root in range(len(entities)):
+        if order[root] is not None:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                order[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            if i < len(edges[node]):
+                work.append((node, i + 1))
+                target = edges[node][i]
+                if order[target] is None:
+                    work.append((target, 0))
+                elif on_stack[target]:
+                    low[node] = min(low[node], order[target])
+                continue
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == order[node]:
+                group = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    group.append(member)
+                    if member == node:
+                        break
+                groups.append([entities[member] for member in sorted(group)])
+    return groups
+
+
+def _packed_chunks(entities, max_entities, max_bytes, ndjson):
+    """Dependency-ordered chunks as (entities, serialized entities), packed up to the limits"""
+    overhead, separator = (0, b"") if ndjson else (len(b'{"entities":[]}'), b",")
+    chunk, lines, size = [], [], overhead
+
+    for group in dependency_order(entities):
+        encoded = [json.dumps(entity, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                   + (b"\n" if ndjson else b"") for entity in group]
+        group_size = sum(len(line) + len(separator) for line in encoded)
+        too_many = max_entities is not None and len(lines) + len(encoded) > max_entities
+        too_big = max_bytes is not None and size + group_size > max_bytes
+        if lines and (too_many or too_big):
+            yield chunk, lines
+            chunk, lines, size = [], [], overhead
+        chunk.extend(group)
+        lines.extend(encoded)
+        size += group_size
+
+    if lines:
+        yield chunk, lines
+
+
+def iter_chunks(entities, max_entities=None, max_bytes=None, ndjson=False):
+    """
+    Split entities into dependency-ordered chunks of at most max_entities / max_bytes.
+
+    Yields (serialized chunk, entity count); chunks are {"entities": [...]} documents, or
+    newline-delimited entities with ndjson. A group of mutually referencing entities is kept
+    whole, so a chunk only exceeds the limits when a single group does.
+    """
+    for chunk, lines in _packed_chunks(entities, max_entities, max_bytes, ndjson):
+        if ndjson:
+            yield b"".join(lines), len(chunk)
+        else:
+            yield b'{"entities":[' + b",".join(lines) + b"]}", len(chunk)
+
+
+def entity_chunks(entities, max_entities=None, max_bytes=None):
+    """The entity lists of the chunks iter_chunks would write, for sending them as requests"""
+    for chunk, _ in _packed_chunks(entities, max_entities, max_bytes, ndjson=False):
+        yield chunk
+
+
+def write_chunks(entities, open_file, max_entities=CHUNK_MAX_ENTITIES, max_bytes=CHUNK_MAX_BYTES, ndjson=False):
+    """
+    Write dependency-ordered chunks and a manifest through open_file(name) → binary file.
+
+    The manifest lists the chunks in ingest order, so an interrupted ingest can resume
+    from the first chunk that was not accepted.
+    """
+    extension = "ndjson" if ndjson else "json"
+    chunks = []
+    for i, (chunk, n_entities) in enumerate(iter_chunks(entities, max_entities, max_bytes, ndjson), start=1):
+        name = f"chunk-{i:05d}.{extension}"
+        with open_file(name) as f:
+            f.write(chunk)
+        chunks.append({"file": name, "entities": n_entities, "bytes": len(chunk)})
+
+    manifest = {
+        "format": extension,
+        "max_entities": max_entities,
+        "max_bytes": max_bytes,
+        "total_entities": len(entities),
+        "chunks": chunks,
+    }
+    with open_file("manifest.json") as f:
+        f.write(json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def chunks_zip(entities, max_entities=CHUNK_MAX_ENTITIES, max_bytes=CHUNK_MAX_BYTES, ndjson=False):
+    """Zip archive (bytes) of the dependency-ordered chunks and their manifest"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        write_chunks(entities, lambda name: archive.open(name, "w"), max_entities, max_bytes, ndjson)
+    return buffer.getvalue()
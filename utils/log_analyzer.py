@@ -0,0 +1,247 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+from collections import Counter
+from datetime import datetime
+
+
+# Samples kept per category of message, and produced files kept at most (memory stays bounded)
+MAX_SAMPLES = 5
+MAX_OUTPUT_FILES = 1000
+MAX_SAMPLE_CHARS = 300
+
+_DECODER = json.JSONDecoder()
+_WARNING = re.compile(r"\b(\w*Warning)\b")
+_ERROR = re.compile(r"\b(\w*(?:Error|Exception))\b")
+# A traceback starts with its header (Python's, or IPython's "ValueError   Traceback (...)") and
+# ends with the unindented "module.ExceptionName: message" line; chained ones are joined by a marker
+_TRACEBACK = "Traceback (most recent call last)"
+_CHAINED = ("During handling of the above exception", "The above exception was the direct cause")
+_EXCEPTION_LINE = re.compile(r"^(?:\w+\.)*(\w*(?:Error|Exception|Warning|Interrupt|Exit))(?::\s|:?\s*$)", re.M)
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+# Files written under the Kaggle working directory, or announced as saved by the notebook
+_OUTPUT_FILES = (
+    re.compile(r"(/kaggle/working/[^\s'\"(),:]+\.\w{1,8})"),
+    re.compile(r"[Ss]av(?:ed|ing)\b[^\n'\"]*?\b(?:to|as|in)\s+['\"]?([\w\-./]+\.\w{1,8})"),
+)
+
+
+def _records(buffer):
+    """
+    Yield (line number, raw line, record) for each line of a Kaggle kernel log.
+
+    Kaggle logs are a JSON array written one record per line ("[{...}", ",{...}", "]"). Lines
+    that are not JSON records are yielded as plain stdout text, blank lines with no record.
+    """
+    position, number = 0, 0
+    size = len(buffer)
+    while position < size:
+        end = buffer.find(b"\n", position)
+        if end == -1:
+            end = size
+        line = buffer[position:end]
+        position = end + 1
+        number += 1
+
+        text = line.strip().lstrip(b"[,").rstrip(b"]").strip()
+        if not text:
+            yield number, line, None
+            continue
+        try:
+            record = _DECODER.decode(text.decode("utf-8", errors="replace"))
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            record = {"stream_name": "stdout", "data": line.decode("utf-8", errors="replace")}
+        yield number, line, record
+
+
+class _Messages:
+    """Counts of warning or error categories with a few sample messages each"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, category, text, time):
+        self.counts[category] += 1
+        samples = self.samples.setdefault(category, [])
+        if len(samples) < MAX_SAMPLES:
+            samples.append({"time": time, "message": text.strip()[:MAX_SAMPLE_CHARS]})
+
+    def as_dict(self):
+        return {
+            "count": sum(self.counts.values()),
+            "categories": dict(self.counts.most_common()),
+            "samples": self.samples,
+        }
+
+
+class _Tracebacks:
+    """
+    Folds each traceback into one error, named by the exception it ends with.
+
+    Kaggle logs often split a traceback over several stderr records (header, frames, exception
+    line), and a chained traceback continues after the first exception line; every stderr record
+    from the header to the end of the last chained exception belongs to the same error. A record
+    of another stream ends the traceback.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.active = False
+        self.time = None
+        self.exception = None
+        self.message = None
+        self.chained = False
+
+    def feed(self, data, time, stream):
+        """Whether the record belongs to a traceback (it is then counted here, not as a plain error)"""
+        if "\x1b" in data:
+            data = _ANSI.sub("", data)
+        if self.active and stream != "stderr":
+            self.flush()
+        if self.active and any(marker in data for marker in _CHAINED):
+            self.chained = True
+        elif self.active and self.exception is not None and not self.chained:
+            # The record after the last exception line ends the traceback
+            self.flush()
+        if not self.active:
+            if _TRACEBACK not in data:
+                return False
+            self.active, self.time, self.message = True, time, data
+        if _TRACEBACK in data:
+            # A (chained) traceback follows: the exception it ends with names the error
+            self.exception, self.chained = None, False
+        exceptions = _EXCEPTION_LINE.findall(data.rpartition(_TRACEBACK)[2])
+        if exceptions:
+            self.exception, self.message = exceptions[-1], data
+        return True
+
+    def flush(self):
+        if self.active:
+            self.errors.add(self.exception or "Traceback", self.message, self.time)
+            self.active, self.exception, self.chained = False, None, False
+
+
+def analyze_buffer(buffer):
+    """Single pass over the bytes of a log (bytes or an mmap), see analyze_log"""
+    num_lines, ascii_only = 0, True
+    start = end = None
+    streams = Counter()
+    warnings, errors = _Messages(), _Messages()
+    tracebacks = _Tracebacks(errors)
+    output_files = {}
+
+    for num_lines, line, record in _records(buffer):
+        ascii_only = ascii_only and line.isascii()
+        if record is None:
+            continue
+
+        time = record.get("time")
+        if isinstance(time, (int, float)):
+            start = time if start is None else min(start, time)
+            end = time if end is None else max(end, time)
+        stream = record.get("stream_name", "stdout")
+        streams[stream] += 1
+
+        data = record.get("data")
+        if not isinstance(data, str) or not data:
+            continue
+        # Substring checks first: most records match none of the patterns
+        if "Warning" in data:
+            for category in dict.fromkeys(_WARNING.findall(data)):
+                warnings.add(category, data, time)
+        in_traceback = (tracebacks.active or "Traceback" in data) and tracebacks.feed(data, time, stream)
+        if not in_traceback and stream == "stderr" and ("Error" in data or "Exception" in data):
+            exceptions = _ERROR.findall(data)
+            if exceptions:
+                errors.add(exceptions[-1], data, time)
+        if ("/kaggle/working/" in data or "aved" in data or "aving" in data) and len(output_files) < MAX_OUTPUT_FILES:
+            for pattern in _OUTPUT_FILES:
+                for path in pattern.findall(data):
+                    output_files.setdefault(path, time)
+
+    tracebacks.flush()
+    return {
+        "num_lines": num_lines,
+        "encoding": "ascii" if ascii_only else "utf-8",
+        "execution_time": {
+            "start": start,
+            "end": end,
+            "duration_seconds": round(end - start, 3) if start is not None else 0,
+        },
+        "streams": dict(streams),
+        "warnings": warnings.as_dict(),
+        "errors": errors.as_dict(),
+        "output_files": [{"path": path, "time": time} for path, time in output_files.items()],
+    }
+
+
+def analyze_log(path):
+    """
+    Analyze an execution log into the log_analysis.json structure.
+
+    The file is memory-mapped and read in one pass, so logs of hundreds of MB are analyzed
+    without loading them: only counters, a few sample messages and the produced files are kept.
+    Besides file_info and execution_time it reports the stdout/stderr record counts, warning
+    and error categories, and the files the run produced.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        if stat.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                analysis = analyze_buffer(buffer)
+        else:
+            analysis = analyze_buffer(b"")
+
+    return {
+        "file_info": {
+            "filename": os.path.basename(path),
+            "filepath": os.path.abspath(path),
+            "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "num_lines": analysis.pop("num_lines"),
+            "encoding": analysis.pop("encoding"),
+            "total_bytes": stat.st_size,
+        },
+        "dataset_info": {
+            "dtypes": {}
+        },
+        "models": [],
+        **analysis,
+    }
+
+
+def write_log_analysis(path, output_path):
+    analysis = analyze_log(path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(analysis, f, indent=2)
+    return analysis
+
+
+def find_log(directory, file_name=None):
+    """The execution log in a directory (file_name if given and present, else the first .log), or None"""
+    if file_name and os.path.exists(os.path.join(directory, file_name)):
+        return os.path.join(directory, file_name)
+    logs = sorted(glob.glob(os.path.join(directory, "*.log")))
+    return logs[0] if logs else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a Kaggle kernel execution log into log_analysis.json.")
+    parser.add_argument("log", help="execution log (.log) of a Kaggle kernel")
+    parser.add_argument("-o", "--output", default="log_analysis.json", help="where the analysis is written")
+    args = parser.parse_args(argv)
+
+    analysis = write_log_analysis(args.log, args.output)
+    file_info = analysis["file_info"]
+    print(f"{file_info['filename']}: {file_info['num_lines']} lines, {file_info['total_bytes']:,} bytes, "
+          f"{analysis['execution_time']['duration_seconds']} s, {analysis['warnings']['count']} warnings, "
+          f"{analysis['errors']['count']} errors, {len(analysis['output_files'])} output files")
+
+
+if __name__ == "__main__":
+    main()
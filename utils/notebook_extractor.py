@@ -0,0 +1,196 @@
+import streamlit as st
+import ast
+import glob
+import json
+import os
+import re
+
+from utils.columnar_cache import file_hash
+
+
+# Modules whose classes are ML models (an estimator instantiated in the notebook is a model it uses)
+MODEL_MODULES = (
+    "sklearn.linear_model", "sklearn.ensemble", "sklearn.tree", "sklearn.svm", "sklearn.neighbors",
+    "sklearn.naive_bayes", "sklearn.neural_network", "sklearn.cluster", "sklearn.discriminant_analysis",
+    "sklearn.gaussian_process", "sklearn.kernel_ridge", "xgboost", "lightgbm", "catboost",
+    "statsmodels.tsa", "prophet",
+)
+# Deep learning frameworks define layers next to models, so only their model classes count
+MODEL_FRAMEWORKS = ("keras", "tensorflow", "torch")
+FRAMEWORK_MODEL_CLASSES = {"Sequential", "Model"}
+METRIC_MODULES = ("sklearn.metrics",)
+READER_FUNCTIONS = ("read_csv", "read_excel", "read_parquet", "read_json", "read_feather", "read_table")
+
+# Calls that render a figure when they appear in a cell without image outputs
+PLOT_MODULES = ("matplotlib", "seaborn", "plotly")
+PLOT_METHODS = {"show", "savefig", "plot", "hist", "scatter", "bar", "barh", "boxplot", "heatmap", "imshow"}
+
+# Model name used for a figure drawn before any model is instantiated
+NO_MODEL = "Unknown"
+
+# Lines IPython understands but Python does not: magics, shell escapes, and help (`?obj`, `obj?`, `obj??`)
+_IPYTHON_LINE = re.compile(r"^\s*[%!?]|^\s*[\w.]+\?{1,2}\s*$")
+
+
+def _source(cell):
+    source = cell.get("source", "")
+    return "".join(source) if isinstance(source, list) else source
+
+
+def _python_source(code):
+    """Code cell source with IPython-only lines commented out, so ast can parse it"""
+    return "\n".join("# " + line if _IPYTHON_LINE.search(line) else line for line in code.splitlines())
+
+
+def _headings(markdown):
+    return [line.lstrip("#").strip() for line in markdown.splitlines()
+            if line.startswith("#") and line.lstrip("#").strip()]
+
+
+def _image_outputs(cell):
+    return sum(1 for output in cell.get("outputs", [])
+               if any(mime.startswith("image/") for mime in output.get("data", {})))
+
+
+def _in_modules(module, modules):
+    return any(module == prefix or module.startswith(prefix + ".") for prefix in modules)
+
+
+class _CellVisitor(ast.NodeVisitor):
+    """Collects imports, model instantiations, metric calls, dataset reads and plot calls of a code cell"""
+
+    def __init__(self, imports):
+        self.imports = imports  # local name → fully qualified name, shared across cells
+        self.models = []
+        self.metrics = []
+        self.datasets = []
+        self.plot_calls = 0
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            # `import a.b` binds `a`; `import a.b as c` binds `c` to a.b
+            name = alias.name if alias.asname else alias.name.split(".")[0]
+            self.imports[alias.asname or name] = name
+
+    def visit_ImportFrom(self, node):
+        if node.module and node.level == 0:
+            for alias in node.names:
+                self.imports[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def _qualified(self, func):
+        """Fully qualified name of a called function or class, resolved through the imports"""
+        parts = []
+        while isinstance(func, ast.Attribute):
+            parts.append(func.attr)
+            func = func.value
+        if not isinstance(func, ast.Name):
+            return None, parts[0] if parts else None
+        base = self.imports.get(func.id)
+        name = ".".join([base or func.id] + parts[::-1])
+        return (name if base else None), (parts[0] if parts else func.id)
+
+    def visit_Call(self, node):
+        qualified, attribute = self._qualified(node.func)
+        if qualified:
+            module, _, name = qualified.rpartition(".")
+            root = qualified.split(".")[0]
+            if _in_modules(module, MODEL_MODULES) and name[:1].isupper() \
+                    or root in MODEL_FRAMEWORKS and name in FRAMEWORK_MODEL_CLASSES:
+                self.models.append(name)
+            elif _in_modules(module, METRIC_MODULES):
+                self.metrics.append(name)
+            elif name in READER_FUNCTIONS and node.args and isinstance(node.args[0], ast.Constant) \
+                    and isinstance(node.args[0].value, str):
+                self.datasets.append(os.path.basename(node.args[0].value))
+            if root in PLOT_MODULES and (name in PLOT_METHODS or name.endswith("plot")
+                                         or qualified.startswith("plotly.express.")):
+                self.plot_calls += 1
+        elif attribute in PLOT_METHODS:
+            # Method calls on figures, axes and DataFrames (df.plot(), ax.hist(), fig.show())
+            self.plot_calls += 1
+        self.generic_visit(node)
+
+
+def _unique(values):
+    return list(dict.fromkeys(values))
+
+
+def extract_notebook_insights(notebook):
+    """
+    Insights of a parsed .ipynb document, in the shape of insights_notebook.json.
+
+    Code cells are parsed with ast: models are estimator classes instantiated from known ML
+    packages, metrics are sklearn.metrics calls, datasets are files read with pandas readers.
+    Each figure (an image output, or a cell with plot calls when the notebook was not executed)
+    is attributed to the current markdown section and the most recent model.
+    """
+    imports = {}
+    models, metrics, datasets, sections, graphs = [], [], [], [], []
+    section = None
+    last_model = NO_MODEL
+
+    for cell in notebook.get("cells", []):
+        if cell.get("cell_type") == "markdown":
+            headings = _headings(_source(cell))
+            sections.extend(headings)
+            if headings:
+                section = headings[-1]
+            continue
+        if cell.get("cell_type") != "code":
+            continue
+
+        visitor = _CellVisitor(imports)
+        try:
+            visitor.visit(ast.parse(_python_source(_source(cell))))
+        except SyntaxError:
+            continue
+
+        models.extend(visitor.models)
+        metrics.extend(visitor.metrics)
+        datasets.extend(visitor.datasets)
+        if visitor.models:
+            last_model = visitor.models[-1]
+
+        n_figures = _image_outputs(cell) or (1 if visitor.plot_calls else 0)
+        for _ in range(n_figures):
+            graphs.append({"name": f"Figure {len(graphs) + 1}", "section": section or "Notebook", "model": last_model})
+
+    return {
+        "datasets": _unique(datasets),
+        "models": _unique(models),
+        "metrics": _unique(metrics),
+        "graphs": graphs,
+        "sections": _unique(sections),
+    }
+
+
+def code_line(insights):
+    """CodeLine section of entities_kaggle.json (graphs as 'Figure N - Model - Section', models) from notebook insights"""
+    return {
+        "graphs": [f"{graph['name']} - {graph['model']} - {graph['section']}" for graph in insights.get("graphs", [])],
+        "models": list(insights.get("models", [])),
+    }
+
+
+def extract_notebook_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return extract_notebook_insights(json.load(f))
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_insights(content_hash, _path):
+    # Keyed by content only: an unchanged notebook (at any path) is never parsed twice
+    return extract_notebook_file(_path)
+
+
+def get_notebook_insights(path):
+    """Notebook insights cached by the SHA-256 of the file, so unchanged notebooks cost only the hash"""
+    return _cached_insights(file_hash(path), path)
+
+
+def find_notebook(directory, file_name=None):
+    """The project notebook in a directory (file_name if given and present, else the first .ipynb), or None"""
+    if file_name and os.path.exists(os.path.join(directory, file_name)):
+        return os.path.join(directory, file_name)
+    notebooks = sorted(glob.glob(os.path.join(directory, "*.ipynb")))
+    return notebooks[0] if notebooks else None
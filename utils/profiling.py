@@ -0,0 +1,58 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import hashlib
+
+from utils.quality import compute_quality, box_statistics
+
+
+# Maximum number of dataset profiles kept in memory (least recently used are evicted)
+PROFILE_CACHE_SIZE = 32
+
+# Rows hashed to fingerprint a dataset
+FINGERPRINT_SAMPLE_ROWS = 1000
+
+
+def dataset_fingerprint(df, sample_rows=FINGERPRINT_SAMPLE_ROWS):
+    """
+    Cheap content fingerprint of a DataFrame.
+
+    Combines the shape, column names and dtypes with a hash of up to sample_rows rows
+    spread evenly over the frame, so the cost does not grow with the dataset size.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, list(df.columns), [str(t) for t in df.dtypes])).encode())
+
+    if len(df) > 0:
+        positions = np.unique(np.linspace(0, len(df) - 1, min(len(df), sample_rows)).astype(np.int64))
+        sample = df.iloc[positions]
+        digest.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+@st.cache_data(
+    max_entries=PROFILE_CACHE_SIZE,
+    hash_funcs={pd.DataFrame: dataset_fingerprint},
+    show_spinner="Profiling dataset...",
+)
+def get_profile(df, numeric_only=True):
+    """
+    Profile of a dataset shared by the Step 1 widgets: summary table, quality facets and box statistics.
+
+    Results are cached by dataset fingerprint across reruns and sessions.
+    """
+    if numeric_only:
+        summary = df.describe().T
+    else:
+        summary = df.describe(include='all').T
+
+    summary['null_count'] = df.isnull().sum()
+    summary['unique_count'] = df.nunique()
+
+    return {
+        "fingerprint": dataset_fingerprint(df),
+        "summary": summary.round(2),
+        "quality": compute_quality(df),
+        "box_stats": box_statistics(df),
+    }
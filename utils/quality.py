@@ -0,0 +1,205 @@
+import pandas as pd
+import numpy as np
+
+
+# Default facet weights (completeness, uniqueness, outliers) and acceptance threshold of the global score
+QUALITY_WEIGHTS = (0.4, 0.3, 0.3)
+QUALITY_THRESHOLD = 75
+
+
+def numeric_matrix(df):
+    """Return the numeric columns of a DataFrame and their values as one float matrix"""
+    columns = df.select_dtypes(include=['number']).columns
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    return columns, values
+
+
+def column_quantiles(values, quantiles):
+    """
+    Quantiles of every column of a 2D float array, ignoring NaNs, in one vectorized pass.
+
+    Columns are sorted together (NaNs go last) and each quantile is linearly
+    interpolated at a position that depends on the column's count of valid values.
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    if values.shape[0] == 0:
+        return np.full((len(quantiles), values.shape[1]), np.nan)
+
+    ordered = np.sort(values.T, axis=1)
+    valid = (~np.isnan(ordered)).sum(axis=1)
+
+    positions = quantiles[:, None] * np.maximum(valid - 1, 0)[None, :]
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, np.maximum(valid - 1, 0)[None, :])
+    weight = positions - lower
+
+    rows = np.arange(ordered.shape[0])[None, :]
+    result = ordered[rows, lower] * (1 - weight) + ordered[rows, upper] * weight
+    result[:, valid == 0] = np.nan
+    return result
+
+
+def iqr_fences(values, k=1.5):
+    """
+    Compute quartiles and IQR fences for every column of a 2D array in one call.
+
+    Returns q1, q3, lower and upper fence arrays with one entry per column.
+    """
+    q1, q3 = column_quantiles(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1, q3, q1 - k * iqr, q3 + k * iqr
+
+
+def count_duplicate_rows(df, numeric_columns=None, values=None):
+    """
+    Count rows that duplicate an earlier row.
+
+    Numeric columns are first combined into a cheap 64-bit row key with NumPy; only rows
+    whose key is repeated can be duplicates, so the exact pandas check runs on those alone.
+    """
+    if numeric_columns is None or values is None:
+        numeric_columns, values = numeric_matrix(df)
+    if len(numeric_columns) == 0:
+        return int(df.duplicated().sum())
+
+    # One 64-bit key per row, mixed from the raw bits of each column. Values that compare equal
+    # must have equal bits: adding 0.0 turns -0.0 into 0.0, and every NaN becomes the same NaN
+    values = np.where(np.isnan(values), np.nan, values + 0.0)
+    bits = values.T.view(np.uint64)
+    multipliers = (np.arange(1, bits.shape[0] + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+    with np.errstate(over="ignore"):
+        keys = ((bits ^ (bits >> np.uint64(29))) * multipliers[:, None]).sum(axis=0, dtype=np.uint64)
+
+    sorted_keys = np.sort(keys)
+    repeated = np.unique(sorted_keys[1:][sorted_keys[1:] == sorted_keys[:-1]])
+    if len(repeated) == 0:
+        return 0
+    candidates = repeated[np.minimum(np.searchsorted(repeated, keys), len(repeated) - 1)] == keys
+    return int(df[candidates].duplicated().sum())
+
+
+def compute_quality(df):
+    """
+    Score the completeness, uniqueness and outliers facets of a DataFrame.
+
+    - completeness: share of non-null cells
+    - uniqueness: share of rows that are not duplicates of a previous row
+    - outliers: 100 minus the mean share of values outside the IQR fences, over the numeric
+      columns with a non-zero IQR (constant or mostly-constant columns have no usable fences)
+
+    All facets are percentages (0-100). A per-column breakdown is returned under "columns".
+    """
+    n_rows, n_cols = df.shape
+    if n_rows == 0 or n_cols == 0:
+        return {"completeness": 100.0, "uniqueness": 100.0, "outliers": 100.0,
+                "columns": pd.DataFrame(columns=["null_ratio", "outlier_count", "outlier_ratio",
+                                                 "lower_fence", "upper_fence"])}
+
+    numeric_columns, values = numeric_matrix(df)
+    is_numeric = df.columns.isin(numeric_columns)
+
+    # Completeness: null counts from the numeric matrix plus the remaining columns
+    null_counts = pd.Series(0, index=df.columns, dtype=np.int64)
+    null_counts[is_numeric] = np.isnan(values).sum(axis=0)
+    if not is_numeric.all():
+        null_counts[~is_numeric] = df.loc[:, ~is_numeric].isna().sum().to_numpy()
+    completeness = 100 * (1 - null_counts.sum() / (n_rows * n_cols))
+
+    # Uniqueness: share of rows that are not repeated
+    uniqueness = 100 * (1 - count_duplicate_rows(df, numeric_columns, values) / n_rows)
+
+    columns = pd.DataFrame({"null_ratio": null_counts / n_rows}, index=df.columns)
+
+    # Outliers: IQR fences of all numeric columns in a single vectorized pass
+    if len(numeric_columns) > 0:
+        q1, q3, lower, upper = iqr_fences(values)
+        spread = q3 > q1
+        with np.errstate(invalid="ignore"):
+            outlier_counts = np.where(spread, ((values < lower) | (values > upper)).sum(axis=0), 0)
+        valid_counts = n_rows - null_counts[numeric_columns].to_numpy()
+        outlier_ratios = outlier_counts / np.maximum(valid_counts, 1)
+        outliers = 100 * (1 - outlier_ratios[spread].mean()) if spread.any() else 100.0
+
+        columns.loc[numeric_columns, "outlier_count"] = outlier_counts
+        columns.loc[numeric_columns, "outlier_ratio"] = outlier_ratios
+        columns.loc[numeric_columns, "lower_fence"] = lower
+        columns.loc[numeric_columns, "upper_fence"] = upper
+    else:
+        outliers = 100.0
+
+    return {
+        "completeness": float(completeness),
+        "uniqueness": float(uniqueness),
+        "outliers": float(outliers),
+        "columns": columns,
+    }
+
+
+def global_quality_score(quality, weights=QUALITY_WEIGHTS):
+    """Weighted global score (0-100) of the completeness, uniqueness and outliers facets"""
+    c, u, o = weights
+    return c*quality["completeness"] + u*quality["uniqueness"] + o*quality["outliers"]
+
+
+def quality_issues(quality):
+    """
+    Data problems found by the facets, in the terms of the cleaning steps that address them.
+
+    Cleaning is offered for any of them, not only when the global score is below the threshold:
+    a dataset can score well overall and still have missing values, duplicates or outliers.
+    """
+    issues = []
+    if quality["completeness"] < 100:
+        issues.append("missing values")
+    if quality["uniqueness"] < 100:
+        issues.append("duplicate rows")
+    if quality["outliers"] < 100:
+        issues.append("outliers")
+    return issues
+
+
+def box_statistics(df, max_outliers=200, random_state=0):
+    """
+    Box plot statistics for all numeric columns of a DataFrame.
+
+    Quartiles come from a single vectorized quantile call over every column; whiskers are the
+    most extreme values inside the 1.5*IQR fences. Outliers are capped at max_outliers per
+    column by random sampling, while n_outliers keeps the real count. Columns without any
+    value have no box: their statistics are None.
+    """
+    numeric_columns, values = numeric_matrix(df)
+    if len(numeric_columns) == 0:
+        return {}
+
+    q1, median, q3 = column_quantiles(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+
+    with np.errstate(invalid="ignore"):
+        inside = (values >= lower_bound) & (values <= upper_bound)
+        outlier_mask = (values < lower_bound) | (values > upper_bound)
+    lower_whisker = np.where(inside, values, np.inf).min(axis=0)
+    upper_whisker = np.where(inside, values, -np.inf).max(axis=0)
+    n_outliers = outlier_mask.sum(axis=0)
+    has_values = ~np.isnan(values).all(axis=0)
+
+    rng = np.random.default_rng(random_state)
+    stats = {}
+    for j, col in enumerate(numeric_columns):
+        if not has_values[j]:
+            stats[col] = None
+            continue
+        outlier_rows = np.flatnonzero(outlier_mask[:, j])
+        if len(outlier_rows) > max_outliers:
+            outlier_rows = rng.choice(outlier_rows, size=max_outliers, replace=False)
+        stats[col] = {
+            "q1": q1[j],
+            "median": median[j],
+            "q3": q3[j],
+            "lowerfence": lower_whisker[j],
+            "upperfence": upper_whisker[j],
+            "n_outliers": int(n_outliers[j]),
+            "outliers": values[outlier_rows, j],
+        }
+    return stats
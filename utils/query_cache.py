@@ -0,0 +1,112 @@
+import hashlib
+import json
+import re
+import threading
+
+from cachetools import TTLCache
+
+from utils.query_engine import parse_query, QueryError
+
+
+# Results kept at most, and for how long (seconds)
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_TTL = 15 * 60
+
+
+def normalize_dsl(dsl):
+    """
+    Canonical text of a DSL query, so equivalent spellings share a cache entry.
+
+    Queries of the supported subset are rebuilt from their parsed form; anything else only has
+    its whitespace collapsed (outside quoted strings).
+    """
+    try:
+        query = parse_query(dsl)
+    except QueryError:
+        parts = re.split(r'("(?:[^"\\]|\\.)*")', dsl)
+        return "".join(part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)).strip()
+
+    text = f"from {query.type_name}"
+    if query.predicates:
+        text += " where " + " and ".join(f"{attribute} {operator} {json.dumps(value)}"
+                                         for attribute, operator, value in query.predicates)
+    if query.select:
+        text += " select " + ", ".join(query.select)
+    if query.limit is not None:
+        text += f" limit {query.limit}"
+    return text
+
+
+def entity_version(entities):
+    """Content hash of an entity set; identical regenerations keep the same version"""
+    digest = hashlib.sha1()
+    for entity in entities:
+        digest.update(json.dumps(entity, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class QueryResultCache:
+    """
+    Query results keyed by (project, source, normalized DSL, entity version), with LRU and TTL eviction.
+
+    Step 3 publishes each project's entities; publishing a different entity set changes the
+    version and drops the project's cached results.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._published = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def publish(self, project, entities):
+        """Register the current entities of a project and return their version"""
+        version = entity_version(entities)
+        with self._lock:
+            previous = self._published.get(project)
+            self._published[project] = (version, entities)
+            if previous is not None and previous[0] != version:
+                self._invalidate(project)
+        return version
+
+    def current(self, project):
+        """(version, entities) last published for a project, or (None, None)"""
+        with self._lock:
+            return self._published.get(project, (None, None))
+
+    def invalidate(self, project):
+        with self._lock:
+            self._invalidate(project)
+
+    def _invalidate(self, project):
+        for key in [key for key in list(self._results.keys()) if key[0] == project]:
+            self._results.pop(key, None)
+
+    def run(self, project, dsl, execute, source="local"):
+        """
+        Cached result of a query on the project's current entities.
+
+        execute(dsl) runs the query on a miss. Returns (result, True if it came from the cache).
+        """
+        version, _ = self.current(project)
+        key = (project, source, normalize_dsl(dsl), version)
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key], True
+            self.misses += 1
+
+        result = execute(dsl)
+        with self._lock:
+            # Skip storing if the entities were republished while the query ran
+            if self._version(project) == version:
+                self._results[key] = result
+        return result, False
+
+    def _version(self, project):
+        published = self._published.get(project)
+        return published[0] if published else None
+
+    def stats(self):
+        return {"entries": len(self._results), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,207 @@
+import re
+from collections import defaultdict
+
+from utils.query_index import IndexCatalog
+
+
+# Comparison operators of the supported DSL subset
+OPERATORS = ("=", "!=", ">", ">=", "<", "<=", "contains")
+
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+  | (?P<op>!=|>=|<=|=|>|<)
+  | (?P<comma>,)
+  | (?P<word>[A-Za-z_][\w.]*)
+)''', re.VERBOSE)
+
+
+class QueryError(ValueError):
+    """A DSL query that cannot be parsed"""
+
+
+class Query:
+    """Parsed form of `from Type [where attr op value [and ...]] [select attr, ...] [limit n]`"""
+
+    def __init__(self, type_name, predicates=(), select=(), limit=None):
+        self.type_name = type_name
+        self.predicates = list(predicates)
+        self.select = list(select)
+        self.limit = limit
+
+    def __repr__(self):
+        return f"Query({self.type_name!r}, {self.predicates!r}, {self.select!r}, {self.limit!r})"
+
+
+def _tokenize(dsl):
+    tokens, position = [], 0
+    dsl = dsl.strip()
+    while position < len(dsl):
+        match = _TOKEN.match(dsl, position)
+        if not match or match.end() == position:
+            raise QueryError(f"Unexpected input at position {position}: {dsl[position:position + 20]!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "string":
+            value = re.sub(r'\\(.)', r'\1', text[1:-1])
+        elif kind == "number":
+            value = float(text) if "." in text else int(text)
+        else:
+            value = text
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+def parse_query(dsl):
+    """Parse the Atlas DSL subset used by the Step 4 query builder into a Query"""
+    tokens = _tokenize(dsl)
+    position = 0
+
+    def peek_keyword():
+        if position < len(tokens) and tokens[position][0] == "word":
+            return tokens[position][1].lower()
+        return None
+
+    def take(kind, description):
+        nonlocal position
+        if position >= len(tokens) or tokens[position][0] != kind:
+            found = tokens[position][1] if position < len(tokens) else "end of query"
+            raise QueryError(f"Expected {description}, found {found!r}")
+        position += 1
+        return tokens[position - 1][1]
+
+    if peek_keyword() != "from":
+        raise QueryError("A query starts with 'from <Type>'")
+    position += 1
+    query = Query(take("word", "an entity type"))
+
+    if peek_keyword() == "where":
+        position += 1
+        while True:
+            attribute = take("word", "an attribute name")
+            if peek_keyword() == "contains":
+                position += 1
+                operator = "contains"
+            else:
+                operator = take("op", "a comparison operator")
+            if position < len(tokens) and tokens[position][0] in ("string", "number"):
+                value = tokens[position][1]
+                position += 1
+            elif peek_keyword() in ("true", "false"):
+                value = peek_keyword() == "true"
+                position += 1
+            else:
+                raise QueryError(f"Expected a value after '{attribute} {operator}'")
+            query.predicates.append((attribute, operator, value))
+            if peek_keyword() != "and":
+                break
+            position += 1
+
+    if peek_keyword() == "select":
+        position += 1
+        query.select.append(take("word", "an attribute name"))
+        while position < len(tokens) and tokens[position][0] == "comma":
+            position += 1
+            query.select.append(take("word", "an attribute name"))
+
+    if peek_keyword() == "limit":
+        position += 1
+        query.limit = take("number", "a row limit")
+
+    if position < len(tokens):
+        raise QueryError(f"Unexpected {tokens[position][1]!r}")
+    return query
+
+
+def matches(value, operator, target):
+    """Evaluate one predicate against an attribute value (lists match if any item matches)"""
+    if value is None:
+        return operator == "!=" and target is not None
+    if isinstance(value, list):
+        if operator == "!=":
+            return all(matches(item, "!=", target) for item in value)
+        return any(matches(item, operator, target) for item in value)
+    if operator == "=":
+        return value == target
+    if operator == "!=":
+        return value != target
+    if operator == "contains":
+        return isinstance(value, str) and str(target) in value
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(target, (int, float)):
+        return False
+    if operator == ">":
+        return value > target
+    if operator == ">=":
+        return value >= target
+    if operator == "<":
+        return value < target
+    return value <= target
+
+
+class QueryEngine:
+    """
+    Evaluates DSL queries against bulk Atlas entities, without an Atlas server.
+
+    Entities are indexed by typeName when the engine is built. Secondary indexes (hash, sorted
+    and trigram, see utils.query_index) are built the first time a predicate needs them, and
+    the planner starts each query from the most selective one.
+    """
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.by_type = defaultdict(list)
+        self.by_guid = {}
+        for entity in entities:
+            self.by_type[entity.get("typeName")].append(entity)
+            if entity.get("guid"):
+                self.by_guid[entity["guid"]] = entity
+        self.indexes = IndexCatalog(self.by_type)
+
+    def plan(self, dsl):
+        """Access path the planner picks for a query"""
+        return self.indexes.plan(parse_query(dsl) if isinstance(dsl, str) else dsl)
+
+    def find(self, query):
+        """Entities matching a parsed query"""
+        candidates = self.indexes.candidates(self.indexes.plan(query))
+
+        results = []
+        for entity in candidates:
+            attributes = entity.get("attributes", {})
+            if all(matches(attributes.get(attribute), operator, value)
+                   for attribute, operator, value in query.predicates):
+                results.append(entity)
+                if query.limit is not None and len(results) >= query.limit:
+                    break
+        return results
+
+    def display_value(self, value):
+        """Attribute value as shown in result tables: references become the referenced entity's name"""
+        if isinstance(value, list):
+            return ", ".join(str(self.display_value(item)) for item in value)
+        if isinstance(value, dict) and "guid" in value:
+            referenced = self.by_guid.get(value["guid"])
+            if referenced is None:
+                return value["guid"]
+            attributes = referenced.get("attributes", {})
+            return attributes.get("name") or attributes.get("qualifiedName") or value["guid"]
+        return value
+
+    def execute(self, dsl, resolve_references=True):
+        """
+        Run a DSL query and return one row (dict) per matching entity.
+
+        Without a select clause every attribute is returned. With resolve_references,
+        object references are replaced by the referenced entity's name.
+        """
+        query = parse_query(dsl) if isinstance(dsl, str) else dsl
+        rows = []
+        for entity in self.find(query):
+            attributes = entity.get("attributes", {})
+            fields = query.select or list(attributes)
+            row = {field: attributes.get(field) for field in fields}
+            if resolve_references:
+                row = {field: self.display_value(value) for field, value in row.items()}
+            rows.append(row)
+        return rows
@@ -0,0 +1,226 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+# Length of the substrings indexed for `contains`
+NGRAM = 3
+
+
+def _items(value):
+    """Indexable items of an attribute value (each item of a list value)"""
+    return value if isinstance(value, list) else [value]
+
+
+def _key(value):
+    if isinstance(value, dict):
+        return value.get("guid") or tuple(sorted(value.items()))
+    return value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _positions(positions):
+    return np.unique(np.asarray(positions, dtype=np.int64))
+
+
+class HashIndex:
+    """Equality index: attribute value → positions of the entities holding it"""
+
+    kind = "hash"
+    operators = ("=",)
+
+    def __init__(self, values):
+        buckets = defaultdict(list)
+        for position, value in enumerate(values):
+            for item in _items(value):
+                if item is not None:
+                    buckets[_key(item)].append(position)
+        self.buckets = {value: _positions(positions) for value, positions in buckets.items()}
+
+    def estimate(self, operator, value):
+        bucket = self.buckets.get(_key(value))
+        return 0 if bucket is None else len(bucket)
+
+    def lookup(self, operator, value):
+        return self.buckets.get(_key(value), np.empty(0, dtype=np.int64))
+
+
+class SortedIndex:
+    """Range index: numeric values sorted once, answered with binary search"""
+
+    kind = "sorted"
+    operators = (">", ">=", "<", "<=", "=")
+
+    def __init__(self, values):
+        numbers, positions = [], []
+        for position, value in enumerate(values):
+            for item in _items(value):
+                if _is_number(item):
+                    numbers.append(item)
+                    positions.append(position)
+        numbers = np.asarray(numbers, dtype=np.float64)
+        order = np.argsort(numbers, kind="stable")
+        self.values = numbers[order]
+        self.positions = np.asarray(positions, dtype=np.int64)[order]
+
+    def _range(self, operator, value):
+        if not _is_number(value):
+            return 0, 0
+        if operator == ">":
+            return np.searchsorted(self.values, value, side="right"), len(self.values)
+        if operator == ">=":
+            return np.searchsorted(self.values, value, side="left"), len(self.values)
+        if operator == "<":
+            return 0, np.searchsorted(self.values, value, side="left")
+        if operator == "<=":
+            return 0, np.searchsorted(self.values, value, side="right")
+        return np.searchsorted(self.values, value, side="left"), np.searchsorted(self.values, value, side="right")
+
+    def estimate(self, operator, value):
+        start, end = self._range(operator, value)
+        return int(end - start)
+
+    def lookup(self, operator, value):
+        start, end = self._range(operator, value)
+        return np.unique(self.positions[start:end])
+
+
+class TokenIndex:
+    """
+    Substring index for `contains`: each distinct string is split into trigrams, and a query
+    only checks the distinct strings holding every trigram of the searched text.
+    """
+
+    kind = "token"
+    operators = ("contains",)
+
+    def __init__(self, values):
+        value_positions = defaultdict(list)
+        for position, value in enumerate(values):
+            for item in _items(value):
+                if isinstance(item, str):
+                    value_positions[item].append(position)
+
+        self.strings = list(value_positions)
+        self.string_positions = [_positions(value_positions[string]) for string in self.strings]
+        grams = defaultdict(list)
+        for string_id, string in enumerate(self.strings):
+            for gram in {string[i:i + NGRAM] for i in range(len(string) - NGRAM + 1)}:
+                grams[gram].append(string_id)
+        self.grams = {gram: np.asarray(ids, dtype=np.int64) for gram, ids in grams.items()}
+
+    def _candidate_strings(self, text):
+        if len(text) < NGRAM:
+            return np.arange(len(self.strings))
+        postings = []
+        for gram in {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}:
+            if gram not in self.grams:
+                return np.empty(0, dtype=np.int64)
+            postings.append(self.grams[gram])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return candidates
+
+    def estimate(self, operator, value):
+        # Upper bound: entities of the strings holding the rarest trigram of the text
+        text = str(value)
+        if len(text) < NGRAM:
+            return sum(len(positions) for positions in self.string_positions)
+        sizes = [len(self.grams.get(text[i:i + NGRAM], ())) for i in range(len(text) - NGRAM + 1)]
+        if min(sizes) == 0:
+            return 0
+        rarest = text[int(np.argmin(sizes)):int(np.argmin(sizes)) + NGRAM]
+        return sum(len(self.string_positions[string_id]) for string_id in self.grams[rarest])
+
+    def lookup(self, operator, value):
+        text = str(value)
+        matched = [self.string_positions[string_id] for string_id in self._candidate_strings(text)
+                   if text in self.strings[string_id]]
+        if not matched:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(matched))
+
+
+# Index used for each operator, in order of preference
+INDEX_KINDS = {
+    "=": HashIndex,
+    ">": SortedIndex,
+    ">=": SortedIndex,
+    "<": SortedIndex,
+    "<=": SortedIndex,
+    "contains": TokenIndex,
+}
+
+
+class QueryPlan:
+    """Access path chosen for a query: the index predicate (or a full type scan) and the rest to verify"""
+
+    def __init__(self, type_name, n_entities, predicate=None, index=None, estimate=None, residual=()):
+        self.type_name = type_name
+        self.n_entities = n_entities
+        self.predicate = predicate
+        self.index = index
+        self.estimate = n_entities if estimate is None else estimate
+        self.residual = list(residual)
+
+    def describe(self):
+        if self.predicate is None:
+            access = f"scan {self.n_entities} {self.type_name} entities"
+        else:
+            attribute, operator, value = self.predicate
+            access = (f"{self.index.kind} index on {self.type_name}.{attribute} ({attribute} {operator} {value!r}), "
+                      f"~{self.estimate} of {self.n_entities} entities")
+        if self.residual:
+            access += "; then filter " + " and ".join(f"{a} {o} {v!r}" for a, o, v in self.residual)
+        return access
+
+
+class IndexCatalog:
+    """
+    Secondary indexes over the entities of each type, built the first time a predicate needs them.
+
+    Positions in the indexes refer to the entity lists of `by_type`.
+    """
+
+    def __init__(self, by_type):
+        self.by_type = by_type
+        self._indexes = {}
+
+    def index(self, type_name, attribute, kind):
+        key = (type_name, attribute, kind)
+        if key not in self._indexes:
+            values = [entity.get("attributes", {}).get(attribute) for entity in self.by_type.get(type_name, [])]
+            self._indexes[key] = kind(values)
+        return self._indexes[key]
+
+    def plan(self, query):
+        """Pick the indexable predicate with the fewest estimated matches; scan the type if none helps"""
+        n_entities = len(self.by_type.get(query.type_name, []))
+        best = QueryPlan(query.type_name, n_entities, residual=query.predicates)
+
+        for predicate in query.predicates:
+            attribute, operator, value = predicate
+            kind = INDEX_KINDS.get(operator)
+            if kind is None or (kind is SortedIndex and not _is_number(value)):
+                continue
+            index = self.index(query.type_name, attribute, kind)
+            estimate = index.estimate(operator, value)
+            if estimate < best.estimate:
+                residual = [p for p in query.predicates if p is not predicate]
+                best = QueryPlan(query.type_name, n_entities, predicate, index, estimate, residual)
+        return best
+
+    def candidates(self, plan):
+        """Entities selected by the plan's access path, in their original order"""
+        entities = self.by_type.get(plan.type_name, [])
+        if plan.predicate is None:
+            return entities
+        _, operator, value = plan.predicate
+        return [entities[position] for position in plan.index.lookup(operator, value)]
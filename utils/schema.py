@@ -0,0 +1,109 @@
+import pandas as pd
+import numpy as np
+
+
+# Formats tried, in order, on text columns that may hold dates
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y"]
+
+# Rows checked before trying to convert a whole text column
+SAMPLE_ROWS = 1000
+
+
+def _parse_dates(col):
+    """Parse a text column with the first date format that fits every value, or return None"""
+    values = col.dropna()
+    if values.empty:
+        return None
+    sample = values.iloc[:SAMPLE_ROWS]
+
+    for fmt in DATE_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            parsed = pd.to_datetime(col, format=fmt, errors="coerce")
+            if parsed.notna().sum() == len(values):
+                return parsed
+    return None
+
+
+def _parse_booleans(col):
+    """Convert a text column of true/false markers to bool, or return None"""
+    values = col.dropna()
+    if values.empty or col.isna().any():
+        return None
+    lowered = values.astype(str).str.lower()
+    if lowered.isin(["true", "false"]).all():
+        return lowered == "true"
+    return None
+
+
+def _downcast_number(col, float_rtol):
+    """Narrowest numeric dtype that holds every value of a column"""
+    if pd.api.types.is_bool_dtype(col):
+        return col
+
+    if pd.api.types.is_float_dtype(col):
+        values = col.to_numpy()
+        finite = values[~np.isnan(values)]
+        # Whole-number floats without nulls are integers read as floats
+        if len(finite) == len(values) and len(values) > 0 and np.array_equal(finite, np.round(finite)):
+            col = col.astype(np.int64)
+        else:
+            narrow = values.astype(np.float32)
+            with np.errstate(over="ignore", invalid="ignore"):
+                fits = np.allclose(narrow.astype(np.float64), values, rtol=float_rtol, atol=0, equal_nan=True)
+            return col.astype(np.float32) if fits and col.dtype != np.float32 else col
+
+    if pd.api.types.is_integer_dtype(col):
+        downcast = "unsigned" if len(col) > 0 and col.min() >= 0 else "integer"
+        return pd.to_numeric(col, downcast=downcast)
+    return col
+
+
+def optimize_dtypes(df, categorical_ratio=0.5, max_categories=1000, float_rtol=0.0):
+    """
+    Shrink the memory footprint of a freshly loaded DataFrame.
+
+    - text columns holding dates are parsed to datetime64
+    - text columns of TRUE/FALSE markers become bool
+    - integers are downcast to the narrowest (unsigned when possible) integer type
+    - floats become float32 only if no value changes by more than float_rtol (lossless by default)
+    - remaining text columns with few distinct values become categoricals
+
+    Returns the optimized DataFrame and a report with the memory saved and the dtype changes.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    optimized = {}
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            converted = _parse_dates(series)
+            if converted is None:
+                converted = _parse_booleans(series)
+            if converted is None:
+                n_unique = series.nunique()
+                if n_unique <= max_categories and n_unique <= categorical_ratio * len(series):
+                    converted = series.astype("category")
+            if converted is not None:
+                optimized[col] = converted
+        elif pd.api.types.is_numeric_dtype(series):
+            converted = _downcast_number(series, float_rtol)
+            if converted.dtype != series.dtype:
+                optimized[col] = converted
+
+    result = df.assign(**optimized) if optimized else df.copy()
+    memory_after = int(result.memory_usage(deep=True).sum())
+
+    report = {
+        "memory_before": memory_before,
+        "memory_after": memory_after,
+        "memory_saved": memory_before - memory_after,
+        "changes": {col: [str(df[col].dtype), str(result[col].dtype)] for col in optimized},
+    }
+    return result, report
+
+
+def read_optimized_csv(path):
+    """Read a CSV and optimize its dtypes; the report is kept in df.attrs["schema_report"]"""
+    df, report = optimize_dtypes(pd.read_csv(path))
+    df.attrs["schema_report"] = report
+    return df
@@ -0,0 +1,215 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.quality import numeric_matrix, column_quantiles
+
+
+# Rows read from the CSV at a time
+CHUNK_SIZE = 200_000
+
+# Rows kept in the uniform sample used for quantiles and plots
+SAMPLE_SIZE = 100_000
+
+# Smallest hashes kept per column (and for whole rows) to estimate distinct counts
+COLUMN_SKETCH_SIZE = 4096
+ROW_SKETCH_SIZE = 65536
+
+# Streaming profiles kept in the cache at most (each holds its row sample)
+STREAMING_PROFILE_CACHE_SIZE = 4
+
+
+def _merge_sketch(sketch, hashes, size):
+    """Keep the `size` smallest distinct hash values of a sketch and a new batch of hashes"""
+    return np.union1d(sketch, np.unique(hashes)[:size])[:size]
+
+
+def _estimate_distinct(sketch, size):
+    """K-minimum-values estimate of a distinct count (exact while the sketch is not full)"""
+    if len(sketch) < size:
+        return len(sketch)
+    return int((size - 1) * 2.0 ** 64 / (float(sketch[size - 1]) + 1))
+
+
+class StreamingProfile:
+    """
+    Single-pass profile of a dataset read in chunks, with memory bounded by the sample and sketch sizes.
+
+    Exact: row count, null counts, min/max, mean and variance (merged with Chan's parallel formula).
+    Approximate: distinct counts (K-minimum-values sketches) and quantiles (uniform bottom-k row sample).
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE, column_sketch_size=COLUMN_SKETCH_SIZE,
+                 row_sketch_size=ROW_SKETCH_SIZE, random_state=0):
+        self.sample_size = sample_size
+        self.column_sketch_size = column_sketch_size
+        self.row_sketch_size = row_sketch_size
+        self._rng = np.random.default_rng(random_state)
+
+        self.n_rows = 0
+        self.columns = None
+        self.numeric_columns = None
+        self.sample = None
+        self._sample_keys = np.empty(0)
+
+    def update(self, chunk):
+        """Accumulate the statistics of one chunk"""
+        if self.columns is None:
+            self._init_columns(chunk)
+        chunk = chunk[self.columns]
+
+        # Columns typed as numeric in the first chunk stay numeric; stray values become nulls
+        coerced = {col: pd.to_numeric(chunk[col], errors="coerce")
+                   for col in self.numeric_columns if not pd.api.types.is_numeric_dtype(chunk[col])}
+        if coerced:
+            chunk = chunk.assign(**coerced)
+
+        self.n_rows += len(chunk)
+        self.null_counts += chunk.isna().sum().to_numpy()
+
+        _, values = numeric_matrix(chunk[self.numeric_columns])
+        self._update_moments(values)
+
+        for col in self.columns:
+            hashes = pd.util.hash_pandas_object(chunk[col].dropna(), index=False).to_numpy()
+            self._column_sketches[col] = _merge_sketch(self._column_sketches[col], hashes, self.column_sketch_size)
+
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        self._row_sketch = _merge_sketch(self._row_sketch, row_hashes, self.row_sketch_size)
+
+        self._update_sample(chunk)
+
+    def _init_columns(self, chunk):
+        self.columns = chunk.columns
+        self.numeric_columns = chunk.select_dtypes(include=['number']).columns
+        n_numeric = len(self.numeric_columns)
+
+        self.null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.count = np.zeros(n_numeric, dtype=np.int64)
+        self.mean = np.zeros(n_numeric)
+        self.m2 = np.zeros(n_numeric)
+        self.min = np.full(n_numeric, np.inf)
+        self.max = np.full(n_numeric, -np.inf)
+        self._column_sketches = {col: np.empty(0, dtype=np.uint64) for col in self.columns}
+        self._row_sketch = np.empty(0, dtype=np.uint64)
+
+    def _update_moments(self, values):
+        count_b = (~np.isnan(values)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(count_b > 0, np.nansum(values, axis=0) / count_b, 0.0)
+            m2_b = np.nansum((values - mean_b) ** 2, axis=0)
+
+            total = self.count + count_b
+            delta = mean_b - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count_b / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2_b + delta ** 2 * self.count * count_b / total, 0.0)
+        self.count = total
+
+        if len(values) > 0:
+            self.min = np.fmin(self.min, np.where(np.isnan(values), np.inf, values).min(axis=0))
+            self.max = np.fmax(self.max, np.where(np.isnan(values), -np.inf, values).max(axis=0))
+
+    def _update_sample(self, chunk):
+        # Bottom-k sampling: every row gets a random key and the smallest keys are kept
+        keys = np.concatenate([self._sample_keys, self._rng.random(len(chunk))])
+        rows = chunk if self.sample is None else pd.concat([self.sample, chunk], ignore_index=True)
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+            keep.sort()
+            keys, rows = keys[keep], rows.iloc[keep].reset_index(drop=True)
+        self._sample_keys = keys
+        self.sample = rows
+
+    def distinct_counts(self):
+        """Approximate number of distinct non-null values per column"""
+        return pd.Series(
+            {col: _estimate_distinct(sketch, self.column_sketch_size) for col, sketch in self._column_sketches.items()},
+            dtype=np.int64,
+        )
+
+    def quantiles(self, quantiles):
+        """Approximate quantiles of the numeric columns, estimated on the row sample"""
+        _, values = numeric_matrix(self.sample[self.numeric_columns])
+        return column_quantiles(values, quantiles)
+
+    def quality(self):
+        """
+        Quality facets in the same shape as utils.quality.compute_quality.
+
+        A column has outliers when its exact min/max fall outside the IQR fences estimated on the
+        sample; per-column outlier ratios are estimated on the sample. As there, the outliers
+        facet is 100 minus the mean ratio over the columns with a non-zero IQR.
+        """
+        n_cols = len(self.columns)
+        if self.n_rows == 0 or n_cols == 0:
+            return {"completeness": 100.0, "uniqueness": 100.0, "outliers": 100.0,
+                    "columns": pd.DataFrame(columns=["null_ratio", "outlier_count", "outlier_ratio",
+                                                     "lower_fence", "upper_fence"])}
+
+        completeness = 100 * (1 - self.null_counts.sum() / (self.n_rows * n_cols))
+        distinct_rows = _estimate_distinct(self._row_sketch, self.row_sketch_size)
+        uniqueness = 100 * min(1.0, distinct_rows / self.n_rows)
+
+        columns = pd.DataFrame({"null_ratio": self.null_counts / self.n_rows}, index=self.columns)
+
+        if len(self.numeric_columns) > 0:
+            q1, q3 = self.quantiles([0.25, 0.75])
+            lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            spread = q3 > q1
+            has_outliers = spread & ((self.min < lower) | (self.max > upper))
+
+            _, sample_values = numeric_matrix(self.sample[self.numeric_columns])
+            with np.errstate(invalid="ignore"):
+                sample_outliers = ((sample_values < lower) | (sample_values > upper)).sum(axis=0)
+            sample_valid = np.maximum((~np.isnan(sample_values)).sum(axis=0), 1)
+            outlier_ratio = np.where(has_outliers, sample_outliers / sample_valid, 0.0)
+            outliers = 100 * (1 - outlier_ratio[spread].mean()) if spread.any() else 100.0
+
+            columns.loc[self.numeric_columns, "outlier_count"] = np.round(outlier_ratio * self.count)
+            columns.loc[self.numeric_columns, "outlier_ratio"] = outlier_ratio
+            columns.loc[self.numeric_columns, "lower_fence"] = lower
+            columns.loc[self.numeric_columns, "upper_fence"] = upper
+        else:
+            outliers = 100.0
+
+        return {
+            "completeness": float(completeness),
+            "uniqueness": float(uniqueness),
+            "outliers": float(outliers),
+            "columns": columns,
+        }
+
+    def summary(self):
+        """Summary table shaped like df.describe().T plus null and unique counts"""
+        q25, q50, q75 = self.quantiles([0.25, 0.5, 0.75])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / (self.count - 1))
+
+        summary = pd.DataFrame({
+            "count": self.count.astype(np.float64),
+            "mean": np.where(self.count > 0, self.mean, np.nan),
+            "std": std,
+            "min": np.where(self.count > 0, self.min, np.nan),
+            "25%": q25,
+            "50%": q50,
+            "75%": q75,
+            "max": np.where(self.count > 0, self.max, np.nan),
+        }, index=self.numeric_columns)
+
+        summary['null_count'] = pd.Series(self.null_counts, index=self.columns)
+        summary['unique_count'] = self.distinct_counts()
+        return summary.round(2)
+
+
+def profile_csv(path, chunksize=CHUNK_SIZE, **profile_options):
+    """Profile a CSV of any size in a single chunked pass"""
+    profile = StreamingProfile(**profile_options)
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        profile.update(chunk)
+    return profile
+
+
+@st.cache_data(max_entries=STREAMING_PROFILE_CACHE_SIZE, show_spinner="Profiling large dataset in chunks...")
+def get_streaming_profile(path, mtime):
+    """Streaming profile of a CSV, cached until the file modification time changes"""
+    return profile_csv(path)